@@ -11,7 +11,7 @@ import asyncio
 import re
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Tuple
+from typing import Annotated, List, Optional, Dict, Any, Tuple
 import uvicorn
 import os
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
@@ -100,6 +100,20 @@ def search(*args, **kwargs):
     from backend.search import search as _search
     return _search(*args, **kwargs)
 
+def search_many(*args, **kwargs):
+    """
+    Lazy wrapper for the batched semantic search function.
+
+    Args:
+        *args: Variable length argument list passed to search_many.
+        **kwargs: Arbitrary keyword arguments passed to search_many.
+
+    Returns:
+        The result of backend.search.search_many.
+    """
+    from backend.search import search_many as _search_many
+    return _search_many(*args, **kwargs)
+
 def create_index(*args, **kwargs):
     """
     Lazy wrapper for creating a new FAISS index.
@@ -518,6 +532,9 @@ async def startup_event():
     global _main_event_loop
     _main_event_loop = asyncio.get_running_loop()
     database.init_database()
+    # Cap FAISS/torch intra-op threads before any search or indexing runs
+    from backend.search import apply_thread_caps
+    apply_thread_caps()
     # Seed embedding config cache from config.ini
     from backend.settings import seed_app_state
     seed_app_state(app)
@@ -750,21 +767,27 @@ async def delete_model(body: dict, request: Request, _=Depends(verify_local_requ
 @app.get("/api/cache/stats")
 def cache_stats_endpoint(_auth=Depends(require_auth)):
     """
-    Get statistics about the AI response cache.
+    Get statistics about the AI response cache and the query embedding cache.
 
     Returns:
-        dict: Cache statistics including hit count and entry count.
+        dict: Cache statistics including hit count and entry count, plus a
+            'query_embeddings' section for the in-memory embedding cache.
     """
-    return database.get_cache_stats()
+    from backend.search import get_query_embedding_cache_stats
+    stats = database.get_cache_stats()
+    stats["query_embeddings"] = get_query_embedding_cache_stats()
+    return stats
 
 @app.post("/api/cache/clear")
 def clear_cache_endpoint(_auth=Depends(require_auth)):
     """
-    Clear all entries from the AI response cache.
+    Clear all entries from the AI response cache (and cached query embeddings).
 
     Returns:
         dict: Success status and the number of entries cleared.
     """
+    from backend.search import clear_query_embedding_cache
+    clear_query_embedding_cache()
     count = database.clear_response_cache()
     return {"status": "success", "cleared_entries": count}
 
@@ -908,6 +931,20 @@ class SearchRequest(BaseModel):
     min_score: Optional[float] = Field(default=None, ge=0.0, le=1.0)
     sort_by: Optional[str] = Field(default=None, pattern="^(relevance|date|filename|file_size)$")
 
+class SearchBatchRequest(BaseModel):
+    """
+    Data model for several searches answered in one request.
+
+    Attributes:
+        queries (List[str]): The search queries, answered in order.
+        file_types, min_score, sort_by: Filters applied to every query,
+            as for SearchRequest.
+    """
+    queries: List[Annotated[str, Field(min_length=1, max_length=5000)]] = Field(..., min_length=1, max_length=32)
+    file_types: Optional[List[str]] = None
+    min_score: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    sort_by: Optional[str] = Field(default=None, pattern="^(relevance|date|filename|file_size)$")
+
 class SearchResult(BaseModel):
     """
     Data model for a single search result item.
@@ -1075,6 +1112,152 @@ async def update_config(config_data: ConfigModel, request: Request, _=Depends(ve
         
     return {"status": "success", "message": "Configuration saved"}
 
+def _provider_and_api_key(config) -> Tuple[str, Optional[str]]:
+    """Return the configured LLM provider and the API key that goes with it."""
+    provider = config.get('LocalLLM', 'provider', fallback='openai')
+
+    # Determine correct API key based on provider
+    api_key = config.get('APIKeys', 'openai_api_key', fallback=None)
+    if provider == 'gemini':
+        api_key = config.get('APIKeys', 'gemini_api_key', fallback=api_key)
+    elif provider == 'anthropic':
+        api_key = config.get('APIKeys', 'anthropic_api_key', fallback=api_key)
+    elif provider == 'grok':
+        api_key = config.get('APIKeys', 'grok_api_key', fallback=api_key)
+    return provider, api_key
+
+
+def _active_model_name(provider: str, model_path: Optional[str]) -> str:
+    """Display name of the model answering searches."""
+    if provider == 'local' and model_path:
+        return os.path.basename(model_path).replace(".gguf", "").replace("-", " ")
+    return provider.capitalize()
+
+
+async def _process_search_results(results, search_data, config, provider, api_key, model_path) -> List[SearchResult]:
+    """
+    Turn raw search() hits into filtered, summarised, sorted SearchResults.
+
+    Shared by /api/search and /api/search/batch. Only the filter fields of
+    `search_data` (file_types, min_score, sort_by) and its query are read.
+    """
+    # OPTIMIZATION: Batch database lookups for missing file info
+    indices_to_lookup = list(dict.fromkeys(
+        result['faiss_idx']
+        for result in results
+        if not result.get('file_path') and result.get('faiss_idx') is not None
+    ))
+
+    file_lookup_map = {}
+    if indices_to_lookup:
+        try:
+            file_lookup_map = database.get_files_by_faiss_indices(indices_to_lookup)
+        except ValueError as ve:
+            logger.warning(f"Batch lookup failed, falling back to sequential: {ve}")
+            # Fallback: manually lookup one by one if batch size exceeded
+            for f_idx in indices_to_lookup:
+                info = database.get_file_by_faiss_index(f_idx)
+                if info:
+                    file_lookup_map[f_idx] = info
+
+    processed_results = []
+
+    # Build normalised filter values once
+    _file_type_filter = {ft.lower().lstrip('.') for ft in (search_data.file_types or [])}
+
+    # Per-result LLM summaries are opt-in: with a local GGUF configured they
+    # add seconds *per result* to every search. The streamed AI answer
+    # (/api/stream-answer) is the intended place for LLM output.
+    _llm_result_summaries = config.getboolean('AdvancedRAG', 'llm_result_summaries', fallback=False)
+
+    for result in results:
+        faiss_idx = result.get('faiss_idx')
+
+        # Apply min_score filter
+        if search_data.min_score is not None:
+            score = result.get('score', 1.0)
+            if score < search_data.min_score:
+                continue
+
+        # Use file info from search result first (it comes from FAISS doc metadata)
+        file_path = result.get('file_path')
+        file_name = result.get('file_name')
+
+        # If not in search result, use batched lookup map
+        if not file_path and faiss_idx in file_lookup_map:
+            file_info = file_lookup_map[faiss_idx]
+            file_path = file_info.get('path')
+            file_name = file_info.get('filename')
+
+        # Apply file type filter
+        if _file_type_filter and file_path:
+            ext = os.path.splitext(file_path)[1].lower().lstrip('.')
+            if ext not in _file_type_filter:
+                continue
+        
+        if _llm_result_summaries:
+            # LLM call; keep it off the event loop
+            summary = await asyncio.to_thread(
+                cached_smart_summary, text=result['document'], query=search_data.query,
+                provider=provider, api_key=api_key, model_path=model_path)
+        else:
+            # Fast extractive summary — no model call, sub-millisecond
+            from backend.llm_integration import summarize as _fast_summarize
+            summary = _fast_summarize(result['document'], question=search_data.query)
+
+        # Convert tags from string to list if needed
+        result_tags = result.get('tags', '')
+        if isinstance(result_tags, str):
+            result_tags = [t.strip() for t in result_tags.split(',') if t.strip()]
+        
+        processed_results.append(SearchResult(
+            document=result['document'],
+            summary=summary,
+            tags=result_tags,
+            faiss_idx=faiss_idx,
+            file_path=file_path,
+            file_name=file_name
+        ))
+    
+    # Apply sort_by if requested (default is relevance from FAISS)
+    if search_data.sort_by and search_data.sort_by != "relevance":
+        if search_data.sort_by == "filename":
+            processed_results.sort(key=lambda r: (r.file_name or "").lower())
+        elif search_data.sort_by == "file_size":
+            # Pre-fetch sizes in a thread to avoid blocking the event loop
+            def _get_size(r):
+                # Single syscall inside try/except — no exists() pre-check, so a
+                # file deleted mid-sort (e.g. during re-index) can't 500 (#345).
+                try:
+                    return os.path.getsize(r.file_path) if r.file_path else 0
+                except OSError:
+                    return 0
+            sizes = await asyncio.to_thread(lambda: [_get_size(r) for r in processed_results])
+            processed_results = [r for _, r in sorted(zip(sizes, processed_results), key=lambda x: x[0], reverse=True)]
+        elif search_data.sort_by == "date":
+            def _get_mtime(r):
+                try:
+                    return os.path.getmtime(r.file_path) if r.file_path else 0
+                except OSError:
+                    return 0
+            mtimes = await asyncio.to_thread(lambda: [_get_mtime(r) for r in processed_results])
+            processed_results = [r for _, r in sorted(zip(mtimes, processed_results), key=lambda x: x[0], reverse=True)]
+
+    # Attach knowledge-graph neighbours (Glean-style "related documents")
+    try:
+        _result_paths = [r.file_path for r in processed_results if r.file_path]
+        if _result_paths:
+            _related_map = await asyncio.to_thread(database.get_related_files, _result_paths)
+            if isinstance(_related_map, dict):
+                for r in processed_results:
+                    if r.file_path and r.file_path in _related_map:
+                        r.related_files = _related_map[r.file_path]
+    except Exception as _rel_err:
+        logger.warning("Related-files lookup failed: %s", _rel_err)
+
+    return processed_results
+
+
 @app.post("/api/search")
 @limiter.limit("30/minute")
 async def search_files(search_data: SearchRequest, request: Request, background_tasks: BackgroundTasks, _auth=Depends(require_auth)):
@@ -1113,16 +1296,7 @@ async def search_files(search_data: SearchRequest, request: Request, background_
         start_time = time.time()
         
         config = load_config()
-        provider = config.get('LocalLLM', 'provider', fallback='openai')
-        
-        # Determine correct API key based on provider
-        api_key = config.get('APIKeys', 'openai_api_key', fallback=None)
-        if provider == 'gemini':
-            api_key = config.get('APIKeys', 'gemini_api_key', fallback=api_key)
-        elif provider == 'anthropic':
-            api_key = config.get('APIKeys', 'anthropic_api_key', fallback=api_key)
-        elif provider == 'grok':
-            api_key = config.get('APIKeys', 'grok_api_key', fallback=api_key)
+        provider, api_key = _provider_and_api_key(config)
 
         is_agentic = config.get('General', 'agent_mode', fallback='False').lower() == 'true'
         
@@ -1164,131 +1338,11 @@ async def search_files(search_data: SearchRequest, request: Request, background_
                 detail="Embedding dimension mismatch: the index was built with a different model. Please re-index your documents.",
             )
         
-        # OPTIMIZATION: Batch database lookups for missing file info
-        indices_to_lookup = list(dict.fromkeys(
-            result['faiss_idx']
-            for result in results
-            if not result.get('file_path') and result.get('faiss_idx') is not None
-        ))
-
-        file_lookup_map = {}
-        if indices_to_lookup:
-            try:
-                file_lookup_map = database.get_files_by_faiss_indices(indices_to_lookup)
-            except ValueError as ve:
-                logger.warning(f"Batch lookup failed, falling back to sequential: {ve}")
-                # Fallback: manually lookup one by one if batch size exceeded
-                for f_idx in indices_to_lookup:
-                    info = database.get_file_by_faiss_index(f_idx)
-                    if info:
-                        file_lookup_map[f_idx] = info
-
-        processed_results = []
-        context_snippets = []
-
-        # Build normalised filter values once
-        _file_type_filter = {ft.lower().lstrip('.') for ft in (search_data.file_types or [])}
-
-        # Per-result LLM summaries are opt-in: with a local GGUF configured they
-        # add seconds *per result* to every search. The streamed AI answer
-        # (/api/stream-answer) is the intended place for LLM output.
-        _llm_result_summaries = config.getboolean('AdvancedRAG', 'llm_result_summaries', fallback=False)
-
-        for result in results:
-            faiss_idx = result.get('faiss_idx')
-
-            # Apply min_score filter
-            if search_data.min_score is not None:
-                score = result.get('score', 1.0)
-                if score < search_data.min_score:
-                    continue
-
-            # Use file info from search result first (it comes from FAISS doc metadata)
-            file_path = result.get('file_path')
-            file_name = result.get('file_name')
-
-            # If not in search result, use batched lookup map
-            if not file_path and faiss_idx in file_lookup_map:
-                file_info = file_lookup_map[faiss_idx]
-                file_path = file_info.get('path')
-                file_name = file_info.get('filename')
-
-            # Apply file type filter
-            if _file_type_filter and file_path:
-                ext = os.path.splitext(file_path)[1].lower().lstrip('.')
-                if ext not in _file_type_filter:
-                    continue
-            
-            if _llm_result_summaries:
-                summary = cached_smart_summary(text=result['document'], query=search_data.query, provider=provider, api_key=api_key, model_path=model_path)
-            else:
-                # Fast extractive summary — no model call, sub-millisecond
-                from backend.llm_integration import summarize as _fast_summarize
-                summary = _fast_summarize(result['document'], question=search_data.query)
-            
-            # Add file context to snippets for AI answer
-            file_prefix = f"[From: {file_name}] " if file_name else ""
-            # Format context for AI (Nexus Insight)
-            # We prefer using the smart summary if available, otherwise raw document text
-            if summary and len(summary) > 20:
-                context_snippets.append(f"{file_prefix}{summary}")
-            else:
-                context_snippets.append(f"{file_prefix}{result['document'][:500]}")
-
-            # Convert tags from string to list if needed
-            result_tags = result.get('tags', '')
-            if isinstance(result_tags, str):
-                result_tags = [t.strip() for t in result_tags.split(',') if t.strip()]
-            
-            processed_results.append(SearchResult(
-                document=result['document'],
-                summary=summary,
-                tags=result_tags,
-                faiss_idx=faiss_idx,
-                file_path=file_path,
-                file_name=file_name
-            ))
-        
-        # Apply sort_by if requested (default is relevance from FAISS)
-        if search_data.sort_by and search_data.sort_by != "relevance":
-            if search_data.sort_by == "filename":
-                processed_results.sort(key=lambda r: (r.file_name or "").lower())
-            elif search_data.sort_by == "file_size":
-                # Pre-fetch sizes in a thread to avoid blocking the event loop
-                def _get_size(r):
-                    # Single syscall inside try/except — no exists() pre-check, so a
-                    # file deleted mid-sort (e.g. during re-index) can't 500 (#345).
-                    try:
-                        return os.path.getsize(r.file_path) if r.file_path else 0
-                    except OSError:
-                        return 0
-                sizes = await asyncio.to_thread(lambda: [_get_size(r) for r in processed_results])
-                processed_results = [r for _, r in sorted(zip(sizes, processed_results), key=lambda x: x[0], reverse=True)]
-            elif search_data.sort_by == "date":
-                def _get_mtime(r):
-                    try:
-                        return os.path.getmtime(r.file_path) if r.file_path else 0
-                    except OSError:
-                        return 0
-                mtimes = await asyncio.to_thread(lambda: [_get_mtime(r) for r in processed_results])
-                processed_results = [r for _, r in sorted(zip(mtimes, processed_results), key=lambda x: x[0], reverse=True)]
-
-        # Attach knowledge-graph neighbours (Glean-style "related documents")
-        try:
-            _result_paths = [r.file_path for r in processed_results if r.file_path]
-            if _result_paths:
-                _related_map = await asyncio.to_thread(database.get_related_files, _result_paths)
-                if isinstance(_related_map, dict):
-                    for r in processed_results:
-                        if r.file_path and r.file_path in _related_map:
-                            r.related_files = _related_map[r.file_path]
-        except Exception as _rel_err:
-            logger.warning("Related-files lookup failed: %s", _rel_err)
+        processed_results = await _process_search_results(
+            results, search_data, config, provider, api_key, model_path)
 
         # Return results immediately - AI Answer will be streamed via separate endpoint
-        active_model_name = provider.capitalize()
-        if provider == 'local' and model_path:
-            active_model_name = os.path.basename(model_path).replace(".gguf", "").replace("-", " ")
+        active_model_name = _active_model_name(provider, model_path)
         
         # Save to search history
         execution_time_ms = int((time.time() - start_time) * 1000)
@@ -1305,6 +1359,82 @@ async def search_files(search_data: SearchRequest, request: Request, background_
         logger.error("Search error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="An error occurred processing your search request")
 
+@app.post("/api/search/batch")
+@limiter.limit("10/minute")
+async def search_files_batch(batch: SearchBatchRequest, request: Request, background_tasks: BackgroundTasks, _auth=Depends(require_auth)):
+    """
+    Run several searches in one request.
+
+    All queries are looked up with one batched FAISS query (see
+    search.search_many); each query's results then go
+    through the same filtering and summarising as /api/search. Agentic mode
+    does not apply here.
+
+    Args:
+        batch (SearchBatchRequest): The queries and shared filters.
+        request (Request): The incoming request object.
+
+    Returns:
+        List[SearchResponse]: One response per query, in request order.
+
+    Raises:
+        HTTPException: 400 if index not loaded, 409 if embedding dimension mismatch.
+    """
+    await ensure_index_loaded()
+    with _index_lock:
+        index_snap, docs_snap, tags_snap = index, docs, tags
+        isumm_snap, csumm_snap, cmap_snap, bm25_snap = index_summaries, cluster_summaries, cluster_map, bm25
+
+    if not index_snap:
+        raise HTTPException(status_code=400, detail="Index not loaded. Please configure and index a folder first.")
+
+    logger.info(f"[API] POST /api/search/batch - {len(batch.queries)} queries")
+
+    try:
+        start_time = time.time()
+        config = load_config()
+        provider, api_key = _provider_and_api_key(config)
+        model_path = config.get('LocalLLM', 'model_path', fallback=None)
+
+        from backend.search import EmbeddingDimensionMismatchError
+        _search_timeout = int(os.getenv("SEARCH_TIMEOUT_SECONDS", "60"))
+        try:
+            batch_results = await asyncio.wait_for(
+                asyncio.to_thread(
+                    search_many,
+                    batch.queries, index_snap, docs_snap, tags_snap,
+                    get_search_embedding_client(request.app),
+                    index_summaries=isumm_snap, cluster_summaries=csumm_snap,
+                    cluster_map=cmap_snap, bm25=bm25_snap
+                ),
+                timeout=_search_timeout,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Search timed out. The embedding service may be unavailable.")
+        except EmbeddingDimensionMismatchError as dim_err:
+            logger.error("[Search] Embedding dimension mismatch: %s", dim_err)
+            raise HTTPException(
+                status_code=409,
+                detail="Embedding dimension mismatch: the index was built with a different model. Please re-index your documents.",
+            )
+
+        active_model_name = _active_model_name(provider, model_path)
+        execution_time_ms = int((time.time() - start_time) * 1000) // len(batch.queries)
+        responses = []
+        for query, (results, _context_snippets) in zip(batch.queries, batch_results):
+            search_data = SearchRequest(query=query, file_types=batch.file_types,
+                                        min_score=batch.min_score, sort_by=batch.sort_by)
+            processed_results = await _process_search_results(
+                results, search_data, config, provider, api_key, model_path)
+            background_tasks.add_task(database.add_search_history, query, len(processed_results), execution_time_ms)
+            responses.append(SearchResponse(results=processed_results, ai_answer="", active_model=active_model_name))
+        return responses
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Batch search error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="An error occurred processing your search request")
+
 @app.post("/api/stream-answer")
 @limiter.limit("30/minute")
 async def stream_answer_endpoint(search_data: SearchRequest, request: Request, _auth=Depends(require_auth)):
@@ -4,7 +4,7 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -135,6 +135,8 @@ def init_database():
     # Indices for faster lookup
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_path ON files(path)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_faiss_start ON files(faiss_start_idx)')
+    # get_file_by_name's exact match (the agent's read_file resolves bare names)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_filename ON files(filename)')
 
 
     # Search history table
@@ -246,6 +248,16 @@ def init_database():
 # File Operations
 # -----------------------------------------------------------------------------
 
+# Column order for positional rows passed to add_file_rows
+FILE_COLUMNS = ('path', 'filename', 'file_type', 'size', 'last_modified',
+                'faiss_start_idx', 'faiss_end_idx', 'tags')
+
+# Shared by add_file, add_files_batch and scripts/benchmark_db_insert.py
+_FILE_INSERT_SQL = (f"INSERT OR REPLACE INTO files ({', '.join(FILE_COLUMNS)}) "
+                    f"VALUES ({', '.join(':' + c for c in FILE_COLUMNS)})")
+_FILE_INSERT_ROW_SQL = (f"INSERT OR REPLACE INTO files ({', '.join(FILE_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(FILE_COLUMNS))})")
+
 def add_file(path: str, filename: str, file_type: str, size: int, last_modified: float,
              faiss_start_idx: int, faiss_end_idx: int, tags: List[str] = None):
     """
@@ -267,11 +279,11 @@ def add_file(path: str, filename: str, file_type: str, size: int, last_modified:
     tags_json = json.dumps(tags) if tags else '[]'
     
     try:
-        cursor.execute('''
-            INSERT OR REPLACE INTO files
-            (path, filename, file_type, size, last_modified, faiss_start_idx, faiss_end_idx, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (path, filename, file_type, size, last_modified, faiss_start_idx, faiss_end_idx, tags_json))
+        cursor.execute(_FILE_INSERT_SQL, {
+            'path': path, 'filename': filename, 'file_type': file_type, 'size': size,
+            'last_modified': last_modified, 'faiss_start_idx': faiss_start_idx,
+            'faiss_end_idx': faiss_end_idx, 'tags': tags_json,
+        })
         conn.commit()
     except Exception as e:
         logger.exception("Error adding file to DB")
@@ -290,17 +302,52 @@ def add_files_batch(files_data: List[Dict]):
     cursor = conn.cursor()
     
     try:
-        cursor.executemany('''
-            INSERT OR REPLACE INTO files
-            (path, filename, file_type, size, last_modified, faiss_start_idx, faiss_end_idx, tags)
-            VALUES (:path, :filename, :file_type, :size, :last_modified, :faiss_start_idx, :faiss_end_idx, :tags)
-        ''', files_data)
+        cursor.executemany(_FILE_INSERT_SQL, files_data)
         conn.commit()
     except Exception as e:
         logger.exception("Error adding batch files to DB")
     finally:
         conn.close()
 
+def add_file_rows(rows: Iterable[Tuple]):
+    """
+    Batch insert files given as positional tuples in FILE_COLUMNS order.
+
+    Cheaper than add_files_batch for large batches: no per-row dict, and
+    rows may be a generator that executemany consumes lazily.
+
+    Args:
+        rows (Iterable[Tuple]): One tuple per file, values in FILE_COLUMNS order.
+    """
+    conn = get_connection()
+
+    try:
+        conn.executemany(_FILE_INSERT_ROW_SQL, rows)
+        conn.commit()
+    except Exception as e:
+        logger.exception("Error adding file rows to DB")
+    finally:
+        conn.close()
+
+def refresh_file_statistics():
+    """
+    Refresh query-planner statistics for the files table after bulk writes.
+
+    Runs a sampled ANALYZE (analysis_limit bounds the cost on large tables)
+    followed by PRAGMA optimize, so range lookups such as
+    get_file_by_faiss_index keep choosing idx_files_faiss_start.
+    """
+    conn = get_connection()
+    try:
+        conn.execute('PRAGMA analysis_limit=400')
+        conn.execute('ANALYZE files')
+        conn.execute('PRAGMA optimize')
+        conn.commit()
+    except Exception:
+        logger.exception("Error refreshing files table statistics")
+    finally:
+        conn.close()
+
 def get_all_files(limit: int = 100, offset: int = 0) -> List[Dict]:
     """
     Retrieve indexed files from the database with pagination.
@@ -1,5 +1,6 @@
 import os
 import faiss
+import hashlib
 import json
 import logging
 import pickle
@@ -15,6 +16,7 @@ from backend.llm_integration import get_embeddings, get_tags, smart_summary, sum
 from backend.file_processing import extract_text, SUPPORTED_EXTENSIONS
 from backend import database
 from backend.clustering import perform_global_clustering
+from backend.search import SparseBM25, apply_thread_caps
 from rank_bm25 import BM25Okapi
 import string
 
@@ -28,6 +30,33 @@ _CHUNKER_VERSION = 'recursive-1000-150'
 _CHUNK_SIZE = 1000
 _CHUNK_OVERLAP = 150
 
+# Vector index layout. Exact flat search is already sub-millisecond for small
+# corpora, so the HNSW graph (approximate, O(log N) per query) only pays off
+# once a corpus reaches _HNSW_MIN_VECTORS chunks.
+_HNSW_MIN_VECTORS = 10_000
+_HNSW_M = 32
+_HNSW_EF_CONSTRUCTION = 200
+# Past _IVFPQ_MIN_VECTORS full float32 vectors dominate RAM, so vectors are
+# OPQ-rotated and product-quantised (_PQ_M bytes each, ~16x smaller for 384-d)
+# and searched only within the nprobe nearest of _IVF_NLIST cells. The cheap
+# PQ pass only shortlists candidates: a second stage re-scores them against
+# FP16 copies of the vectors (memory-mapped for large files, see below), so
+# final ranking is near-exact.
+_IVFPQ_MIN_VECTORS = 50_000
+_IVF_NLIST = 1024
+_PQ_M = 32
+# OPQ and IVF k-means train on at most this many random vectors per cell;
+# a few hundred points per centroid is plenty, and training on the whole
+# corpus makes build time grow with it for no recall gain.
+_IVF_TRAIN_PER_CELL = 256
+
+# Index files at least this large are memory-mapped on load instead of read
+# into RAM: vector storage is then served from the OS page cache (hot pages
+# stay resident, cold ones cost a page fault), so RSS no longer grows with
+# the corpus. Not used on Windows, where a mapped file cannot be replaced by
+# the next save_index().
+_MMAP_MIN_BYTES = 256 * 1024 * 1024
+
 # Checkpoint file for resume-on-failure support
 _CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'index_checkpoint.json')
 
@@ -119,8 +148,14 @@ def safe_extract_text(filepath: str) -> Tuple[str, Optional[str]]:
         logger.info(f"Error reading {filepath}: {e}")
         return filepath, None
 
+def _chunk_hash(text: str) -> bytes:
+    """SHA-256 of a chunk's text, the key for content-based vector reuse."""
+    return hashlib.sha256(text.encode('utf-8', 'replace')).digest()
+
+
 def _load_reusable_chunks(previous_index_path: str, current_files: List[str],
-                          current_model_name: str) -> Dict[str, List[Tuple[str, Any]]]:
+                          current_model_name: str,
+                          vectors_by_hash: Optional[Dict[bytes, Any]] = None) -> Dict[str, List[Tuple[str, Any]]]:
     """
     Load chunks + embedding vectors from the previous index for files that
     have not changed since it was built (same path, size, and mtime).
@@ -129,6 +164,12 @@ def _load_reusable_chunks(previous_index_path: str, current_files: List[str],
     unchanged; otherwise an empty dict is returned and the caller does a
     full re-index.
 
+    Args:
+        vectors_by_hash (Dict[bytes, np.ndarray], optional): If given, also
+            filled with every previous chunk's vector keyed by
+            ``_chunk_hash(text)``, so identical chunks of renamed, touched or
+            partially edited files can skip re-embedding too.
+
     Returns:
         Dict[str, List[Tuple[str, np.ndarray]]]: {filepath: [(chunk_text, vector), ...]}
     """
@@ -153,15 +194,17 @@ def _load_reusable_chunks(previous_index_path: str, current_files: List[str],
                         prev_model, current_model_name)
             return {}
 
-        fingerprints = database.get_file_fingerprints()
-        if not fingerprints:
-            return {}
-
         with open(docs_path, 'rb') as f:
             prev_chunks = pickle.load(f)
         prev_index = faiss.read_index(previous_index_path)
         if not prev_chunks or prev_index.ntotal != len(prev_chunks):
             return {}
+        if isinstance(prev_index, (faiss.IndexPreTransform, faiss.IndexIVF)):
+            # Product-quantised vectors are approximations; re-encoding them
+            # would drift further on every run, so re-embed instead. (Refined
+            # indices reconstruct from their FP16 stage and are reusable.)
+            logger.info("[Index] Previous index is compressed — full re-embed required.")
+            return {}
         all_vectors = prev_index.reconstruct_n(0, prev_index.ntotal)
 
         # Group previous chunks (position, text) by source file
@@ -171,6 +214,14 @@ def _load_reusable_chunks(previous_index_path: str, current_files: List[str],
                 return {}
             by_file.setdefault(chunk.get('filepath'), []).append((pos, chunk.get('text', '')))
 
+        if vectors_by_hash is not None:
+            for pos, chunk in enumerate(prev_chunks):
+                vectors_by_hash[_chunk_hash(chunk.get('text', ''))] = all_vectors[pos]
+
+        fingerprints = database.get_file_fingerprints()
+        if not fingerprints:
+            return {}
+
         current_set = set(current_files)
         reusable: Dict[str, List[Tuple[str, Any]]] = {}
         for filepath, entries in by_file.items():
@@ -192,6 +243,89 @@ def _load_reusable_chunks(previous_index_path: str, current_files: List[str],
         return {}
 
 
+def _is_mmap_candidate(path: str) -> bool:
+    """True if the index file at ``path`` is (or would be) loaded memory-mapped."""
+    return os.name != 'nt' and os.path.exists(path) and os.path.getsize(path) >= _MMAP_MIN_BYTES
+
+
+def _read_index_file(path: str) -> faiss.Index:
+    """Reads a FAISS index, memory-mapping its vectors when the file is large."""
+    if _is_mmap_candidate(path):
+        logger.info("[Index] Memory-mapping %s", path)
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+    return faiss.read_index(path)
+
+
+def _write_index_file(index: faiss.Index, path: str) -> None:
+    """
+    Writes a FAISS index to ``path`` atomically.
+
+    The index goes to ``path + '.tmp'`` in the same directory and is then
+    renamed over ``path``, so a failed write (disk full, killed process)
+    leaves the previous index intact. The rename also gives the file a fresh
+    inode: an index being served memory-mapped from the old file keeps its
+    pages until it is released.
+    """
+    tmp_path = path + '.tmp'
+    try:
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _build_vector_index(vectors: np.ndarray) -> faiss.Index:
+    """
+    Builds the FAISS index for a float32 ``(n, d)`` vector matrix.
+
+    Vectors are L2-normalised (on a copy) and every tier uses inner-product
+    search: on unit vectors ``||a - b||^2 = 2 - 2 a.b``, so the ranking is
+    unchanged while the scan skips the norm terms and hits the BLAS fast path.
+
+    Small corpora get an exact ``IndexFlatIP``; from ``_HNSW_MIN_VECTORS``
+    vectors upward an HNSW graph over FP16-stored vectors (``IndexHNSWSQ``)
+    is built instead, halving vector memory and scan bandwidth. Both support
+    ``reconstruct_n`` (FP16 rounding is stable, so reused vectors do not
+    drift), so search and incremental reuse treat them the same. From
+    ``_IVFPQ_MIN_VECTORS`` upward (when the dimension splits into ``_PQ_M``
+    sub-vectors) a compressed ``OPQ,IVF,PQ`` index, trained on a random sample
+    of ``_IVF_TRAIN_PER_CELL`` vectors per IVF cell, is used, wrapped
+    in a two-stage ``IndexRefine``: PQ distances shortlist ``k * k_factor``
+    candidates and their FP16 vectors give the final scores. Reconstruction
+    reads the FP16 stage, so this tier is also safe for incremental reuse.
+
+    Args:
+        vectors (np.ndarray): Float32 embedding matrix to index; not modified.
+
+    Returns:
+        faiss.Index: The populated index.
+    """
+    dim = vectors.shape[1]
+    vectors = np.array(vectors, dtype='float32', order='C')  # copy
+    faiss.normalize_L2(vectors)
+    if vectors.shape[0] >= _IVFPQ_MIN_VECTORS and dim % _PQ_M == 0:
+        index = faiss.index_factory(dim, f"OPQ{_PQ_M},IVF{_IVF_NLIST},PQ{_PQ_M},Refine(SQfp16)",
+                                    faiss.METRIC_INNER_PRODUCT)
+        n_train = _IVF_TRAIN_PER_CELL * _IVF_NLIST
+        if vectors.shape[0] > n_train:
+            # Fixed seed: rebuilding the same corpus gives the same index
+            sample = np.random.default_rng(0).choice(vectors.shape[0], n_train, replace=False)
+            index.train(vectors[np.sort(sample)])
+        else:
+            index.train(vectors)
+    elif vectors.shape[0] >= _HNSW_MIN_VECTORS:
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_fp16, _HNSW_M,
+                                  faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = _HNSW_EF_CONSTRUCTION
+        index.train(vectors)  # no-op for fp16, but required before add()
+    else:
+        index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    return index
+
+
 def create_index(folder_paths: List[str] | str, provider: str, api_key: str = None,
                  model_path: str = None, progress_callback: callable = None,
                  embedding_client: Any = None, previous_index_path: str = None) -> Tuple:
@@ -250,13 +384,17 @@ def create_index(folder_paths: List[str] | str, provider: str, api_key: str = No
         logger.info("[Index] Using pre-resolved embedding client from app.state.")
     else:
         embeddings_model = get_embeddings(provider, api_key, model_path)
+    # A local embedding model may have just imported torch; cap its pools too
+    apply_thread_caps()
     _model_name = getattr(embeddings_model, 'model_name', None) or getattr(embeddings_model, 'model', 'unknown')
 
     # 3. Incremental reuse — must run BEFORE the DB is cleared, because file
     # fingerprints (size/mtime) from the previous run live in the files table.
     reuse_map: Dict[str, List[Tuple[str, Any]]] = {}
+    vectors_by_hash: Dict[bytes, Any] = {}
     if previous_index_path:
-        reuse_map = _load_reusable_chunks(previous_index_path, all_files, str(_model_name))
+        reuse_map = _load_reusable_chunks(previous_index_path, all_files, str(_model_name),
+                                          vectors_by_hash)
         if reuse_map:
             logger.info(f"[Index] Incremental: reusing chunks+vectors for "
                         f"{len(reuse_map)}/{len(all_files)} unchanged files.")
@@ -277,7 +415,6 @@ def create_index(folder_paths: List[str] | str, provider: str, api_key: str = No
 
     # Load checkpoint to resume after a failure. The fingerprint ties the
     # checkpoint to this exact file set so leftovers from other runs are ignored.
-    import hashlib
     _fingerprint = hashlib.sha256("\n".join(sorted(all_files)).encode('utf-8', 'replace')).hexdigest()[:16]
     checkpoint = _load_checkpoint(_fingerprint)
     files_to_extract = [f for f in all_files if f not in checkpoint and f not in reuse_map]
@@ -358,7 +495,9 @@ def create_index(folder_paths: List[str] | str, provider: str, api_key: str = No
             if not text:
                 continue
             file_chunks = text_splitter.split_text(text)
-            file_vecs = [None] * len(file_chunks)
+            # Chunks whose exact text was embedded last run keep that vector
+            file_vecs = [vectors_by_hash.get(_chunk_hash(c)) for c in file_chunks] if vectors_by_hash \
+                else [None] * len(file_chunks)
 
         if not file_chunks:
             continue
@@ -400,6 +539,8 @@ def create_index(folder_paths: List[str] | str, provider: str, api_key: str = No
 
     if files_to_add:
         database.add_files_batch(files_to_add)
+    # Bulk writes leave planner statistics stale; refresh once per run
+    database.refresh_file_statistics()
     logger.info(f"Generated {len(chunk_strings)} total chunks "
                 f"({len(chunk_strings) - len(pending_texts)} reused, {len(pending_texts)} to embed).")
 
@@ -476,7 +617,7 @@ def create_index(folder_paths: List[str] | str, provider: str, api_key: str = No
     if progress_callback: progress_callback(66, 100, "Building Keyword Index...")
     logger.info("Step 3.5/5: Building BM25 Index...")
     tokenized_corpus = [tokenize(doc) for doc in chunk_strings]
-    bm25 = BM25Okapi(tokenized_corpus)
+    bm25 = SparseBM25(tokenized_corpus)
 
     # 6. Build Knowledge Graph (Fast) - 68% to 95%
     if progress_callback: progress_callback(70, 100, "Building Knowledge Graph...")
@@ -604,15 +745,13 @@ def create_index(folder_paths: List[str] | str, provider: str, api_key: str = No
         )
         _clear_checkpoint()
         return None, None, None, None, None, None, None, {}
-    index_chunks = faiss.IndexFlatL2(chunk_emb_np.shape[1])
-    index_chunks.add(chunk_emb_np)
+    index_chunks = _build_vector_index(chunk_emb_np)
     
     # Summary Index
     if cluster_summaries:
         summary_embeddings = embeddings_model.embed_documents(cluster_summaries)
         summary_emb_np = np.array(summary_embeddings).astype('float32')
-        index_summaries = faiss.IndexFlatL2(summary_emb_np.shape[1])
-        index_summaries.add(summary_emb_np)
+        index_summaries = _build_vector_index(summary_emb_np)
     else:
         index_summaries = None
     
@@ -657,7 +796,7 @@ def save_index(index_chunks: faiss.Index, all_chunks: List[Dict], tags: List[str
         model_name (str): The name of the embedding model used.
         embedding_dim (int): The expected vector dimensionality.
     """
-    faiss.write_index(index_chunks, filepath)
+    _write_index_file(index_chunks, filepath)
     base_path = os.path.splitext(filepath)[0]
 
     # ── Metadata sidecar ───────────────────────────────────────────────────
@@ -680,7 +819,7 @@ def save_index(index_chunks: faiss.Index, all_chunks: List[Dict], tags: List[str
         pickle.dump(tags, f)
         
     if index_summaries is not None:
-        faiss.write_index(index_summaries, base_path + '_summary.index')
+        _write_index_file(index_summaries, base_path + '_summary.index')
         with open(base_path + '_summaries.pkl', 'wb') as f:
             pickle.dump(cluster_summaries, f)
         with open(base_path + '_cluster_map.pkl', 'wb') as f:
@@ -724,7 +863,7 @@ def load_index(filepath: str) -> Tuple:
     if not os.path.exists(filepath):
         return None, None, None, None, None, None, None, {}
 
-    index_chunks = faiss.read_index(filepath)
+    index_chunks = _read_index_file(filepath)
     base_path = os.path.splitext(filepath)[0]
 
     # ── Load metadata sidecar (non-fatal if missing for legacy indices) ────
@@ -780,7 +919,7 @@ def load_index(filepath: str) -> Tuple:
     summary_idx_path = base_path + '_summary.index'
     if os.path.exists(summary_idx_path):
         try:
-            index_summaries = faiss.read_index(summary_idx_path)
+            index_summaries = _read_index_file(summary_idx_path)
             
             # Load summaries
             sum_path_pkl = base_path + '_summaries.pkl'
@@ -812,6 +951,9 @@ def load_index(filepath: str) -> Tuple:
             with open(bm25_path, 'rb') as f:
                 bm25 = pickle.load(f)
             logger.info("Loaded BM25 from disk.")
+            if isinstance(bm25, BM25Okapi) and not isinstance(bm25, SparseBM25):
+                # Pickled by an older version; rebuild to get sparse scoring
+                bm25 = None
         except Exception as e:
             logger.warning(f"BM25 index load failed ({type(e).__name__}: {e}); will reconstruct from corpus.")
              
@@ -819,7 +961,7 @@ def load_index(filepath: str) -> Tuple:
         logger.info("Reconstructing BM25 Index...")
         chunk_strings = [chunk['text'] for chunk in all_chunks]
         tokenized_corpus = [tokenize(doc) for doc in chunk_strings]
-        bm25 = BM25Okapi(tokenized_corpus)
+        bm25 = SparseBM25(tokenized_corpus)
 
     logger.info(f"Loaded RAPTOR Index: {len(all_chunks)} chunks, {len(cluster_summaries) if cluster_summaries else 0} clusters.")
     return index_chunks, all_chunks, tags, index_summaries, cluster_summaries, cluster_map, bm25, meta
@@ -111,6 +111,19 @@ _DEFAULT_RAG_SYSTEM_PROMPT = (
     "Quote specific facts and reference file names when possible."
 )
 
+def _warm_local_embeddings(embeddings: Any) -> None:
+    """
+    Runs one throwaway forward pass through a freshly loaded local model.
+
+    The first encode pays tokenizer setup and torch kernel initialisation on
+    top of the model load; doing it here, while the client is being cached,
+    keeps that cost off the first real query.
+    """
+    try:
+        embeddings.embed_query("warmup")
+    except Exception as e:
+        logger.debug("Embedding warm-up pass failed: %s", e)
+
 def get_embeddings(provider: str, api_key: str = None, model_path: str = None) -> Any:
     """
     Returns an embeddings model instance based on the provider.
@@ -157,6 +170,7 @@ def _load_embeddings_unlocked(provider: str, api_key: str, cache_key: str) -> An
             model_kwargs={'device': 'cpu'},
             encode_kwargs={'normalize_embeddings': True}
         )
+        _warm_local_embeddings(embeddings)
     else:
         # Default / Local
         logger.info("Loading local embeddings (HuggingFace)...")
@@ -169,6 +183,7 @@ def _load_embeddings_unlocked(provider: str, api_key: str, cache_key: str) -> An
             model_kwargs={'device': 'cpu'},
             encode_kwargs={'normalize_embeddings': True}
         )
+        _warm_local_embeddings(embeddings)
 
     
     logger.info("Embeddings loaded!")
@@ -272,6 +287,7 @@ def get_embedding_client(provider_type: str, model_name: str = None, api_key: st
                 model_kwargs={'device': 'cpu'},
                 encode_kwargs={'normalize_embeddings': True},
             )
+            _warm_local_embeddings(client)
             _embedding_client_cache[cache_key] = client
             return client
 
@@ -440,6 +440,10 @@ def get_available_models():
 
     Returns:
         list: A list of model configuration dictionaries.
+
+    Note:
+        Returns the module-level ``AVAILABLE_MODELS`` list itself, not a
+        copy, so repeated calls cost nothing. Callers must not mutate it.
     """
     return AVAILABLE_MODELS
 
@@ -456,26 +460,78 @@ def get_local_models():
     """
     models = []
     if os.path.exists(MODELS_DIR):
-        for f in os.listdir(MODELS_DIR):
-            if f.endswith(".gguf"):
-                filepath = os.path.join(MODELS_DIR, f)
-                size = os.path.getsize(filepath)
-                
-                # Try to find metadata from AVAILABLE_MODELS
-                model_id = f.replace(".gguf", "")
-                available_model = next((m for m in AVAILABLE_MODELS if m["id"] == model_id), None)
-                
-                models.append({
-                    "id": model_id,
-                    "filename": f,
-                    "path": os.path.abspath(filepath),
-                    "size": size,
-                    "name": available_model["name"] if available_model else f.replace(".gguf", "").replace("-", " ").replace(".", " "),
-                    "category": available_model["category"] if available_model else "unknown",
-                    "ram_required": available_model["ram_required"] if available_model else None
-                })
+        # scandir yields name, path and file type in one pass; DirEntry.stat()
+        # replaces a separate join + getsize per model
+        with os.scandir(MODELS_DIR) as it:
+            entries = [(e.name, e.path, e.stat().st_size) for e in it
+                       if e.name.endswith(".gguf") and e.is_file()]
+        for f, filepath, size in entries:
+            # Try to find metadata from AVAILABLE_MODELS
+            model_id = f.replace(".gguf", "")
+            available_model = next((m for m in AVAILABLE_MODELS if m["id"] == model_id), None)
+            
+            models.append({
+                "id": model_id,
+                "filename": f,
+                "path": os.path.abspath(filepath),
+                "size": size,
+                "name": available_model["name"] if available_model else f.replace(".gguf", "").replace("-", " ").replace(".", " "),
+                "category": available_model["category"] if available_model else "unknown",
+                "ram_required": available_model["ram_required"] if available_model else None
+            })
     return models
 
+def llama_thread_kwargs(cpus=None):
+    """
+    Returns Llama(...) thread arguments sized to this machine.
+
+    Prefill is compute-bound, so batched prompt processing uses every core;
+    decoding leaves two free, as get_local_llm does. Both are capped at 16,
+    past which llama.cpp stops scaling on CPU.
+
+    Args:
+        cpus (int, optional): Cores to size for. Defaults to os.cpu_count().
+
+    Returns:
+        dict: ``n_threads`` and ``n_threads_batch``.
+    """
+    cpus = cpus or os.cpu_count() or 4
+    return {"n_threads": min(16, max(cpus - 2, 1)), "n_threads_batch": min(16, cpus)}
+
+def _cuda_device_count():
+    """Number of CUDA devices torch can see (0 without torch)."""
+    try:
+        import torch
+        return torch.cuda.device_count()
+    except ImportError:
+        return 0
+
+def llama_gpu_kwargs():
+    """
+    Returns the Llama(...) GPU offload arguments for this host.
+
+    If the installed llama-cpp build can offload, every layer goes to the
+    GPU (``LLAMA_N_GPU_LAYERS`` overrides, as in get_local_llm) and, with
+    several CUDA devices visible to torch, the model is split evenly across
+    them. CPU-only builds get no extra arguments.
+
+    Returns:
+        dict: Keyword arguments to merge into the Llama constructor call.
+    """
+    try:
+        import llama_cpp
+        supports_offload = bool(llama_cpp.llama_supports_gpu_offload())
+    except (ImportError, AttributeError):
+        supports_offload = False
+    if not supports_offload:
+        return {}
+
+    kwargs = {"n_gpu_layers": int(os.getenv("LLAMA_N_GPU_LAYERS", "-1")), "main_gpu": 0}
+    device_count = _cuda_device_count()
+    if device_count > 1:
+        kwargs["tensor_split"] = [1.0 / device_count] * device_count
+    return kwargs
+
 def check_system_resources(model):
     """
     Validates if the system has enough disk space and RAM for a model.
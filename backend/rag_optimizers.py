@@ -1,14 +1,18 @@
 import logging
 import threading
 import time
+from collections import OrderedDict
 from typing import List, Dict, Any
 
+import numpy as np
+
 from backend.llm_integration import generate_ai_answer
 
 logger = logging.getLogger(__name__)
 
-# Cache for query rewriting; capped at _CACHE_MAX entries (LRU-style eviction)
-_QUERY_REWRITE_CACHE: Dict[str, str] = {}
+# Cache for query rewriting; capped at _CACHE_MAX entries, least recently
+# used evicted first (hits move an entry to the end)
+_QUERY_REWRITE_CACHE: "OrderedDict[str, str]" = OrderedDict()
 _CACHE_MAX = 500
 _cache_lock = threading.Lock()
 
@@ -29,11 +33,13 @@ def rewrite_query(query: str, provider: str, api_key: str, model_path: str = "")
         str: An optimized, keyword-dense search query string.
 
     Note:
-        The function uses a bounded memory cache (max 500 entries) to avoid
+        The function uses a bounded LRU cache (max 500 entries) to avoid
         redundant LLM calls for identical queries in the same session.
     """
-    if query in _QUERY_REWRITE_CACHE:
-        return _QUERY_REWRITE_CACHE[query]
+    with _cache_lock:
+        if query in _QUERY_REWRITE_CACHE:
+            _QUERY_REWRITE_CACHE.move_to_end(query)
+            return _QUERY_REWRITE_CACHE[query]
 
     system_instruction = (
         "You are an expert search engine query optimizer. "
@@ -62,12 +68,12 @@ def rewrite_query(query: str, provider: str, api_key: str, model_path: str = "")
         elapsed = time.time() - start_time
         logger.debug("Query rewritten to: '%s' (%.2fs)", rewritten, elapsed)
 
-        # Evict oldest entry if cache is full, then store
+        # Store, then evict least recently used entries beyond the cap
         with _cache_lock:
-            if len(_QUERY_REWRITE_CACHE) >= _CACHE_MAX:
-                oldest_key = next(iter(_QUERY_REWRITE_CACHE), None)
-                _QUERY_REWRITE_CACHE.pop(oldest_key, None)
             _QUERY_REWRITE_CACHE[query] = rewritten
+            _QUERY_REWRITE_CACHE.move_to_end(query)
+            while len(_QUERY_REWRITE_CACHE) > _CACHE_MAX:
+                _QUERY_REWRITE_CACHE.popitem(last=False)
         return rewritten
     except Exception as e:
         logger.warning("Query rewrite failed: %s. Falling back to original query.", e)
@@ -78,6 +84,10 @@ def rewrite_query(query: str, provider: str, api_key: str, model_path: str = "")
 _RERANKER_CACHE = {}
 _reranker_lock = threading.Lock()
 
+# Upper bound on pairs per Cross-Encoder forward pass; candidate pools are
+# small (top ~20-50), so this usually scores everything in one batch.
+_RERANK_BATCH_SIZE = 32
+
 def rerank_results(query: str, chunks: List[Dict[str, Any]], reranker_model_name: str) -> List[Dict[str, Any]]:
     """
     Re-scores and re-orders search results using a Cross-Encoder model.
@@ -123,21 +133,30 @@ def rerank_results(query: str, chunks: List[Dict[str, Any]], reranker_model_name
     reranker = _RERANKER_CACHE[reranker_model_name]
 
     # Prepare inputs: list of (query, document) pairs
-    pairs = [[query, chunk['document']] for chunk in chunks]
+    pairs = [(query, chunk['document']) for chunk in chunks]
 
     logger.debug("Re-ranking %d candidate chunks", len(chunks))
     start_time = time.time()
 
     try:
-        scores = reranker.predict(pairs)
+        scores = reranker.predict(
+            pairs,
+            batch_size=min(_RERANK_BATCH_SIZE, len(pairs)),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+
+        scores = np.asarray(scores)
 
-        # Inject the new cross-encoder score and sort
-        for i, chunk in enumerate(chunks):
+        # Inject the new cross-encoder score
+        for chunk, score in zip(chunks, scores.tolist()):
             # We preserve the original FAISS/BM25 score, but sort by this one
-            chunk['rerank_score'] = float(scores[i])
+            chunk['rerank_score'] = score
 
-        # Higher score is better in Cross-Encoders
-        ranked_chunks = sorted(chunks, key=lambda x: x.get('rerank_score', -999.0), reverse=True)
+        # Higher score is better in Cross-Encoders; a stable argsort on the
+        # negated scores keeps ties in retrieval order, like sorted(reverse=True)
+        order = np.argsort(-scores, kind='stable')
+        ranked_chunks = [chunks[i] for i in order]
 
         elapsed = time.time() - start_time
         logger.debug("Re-ranking complete in %.2fs", elapsed)
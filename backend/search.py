@@ -1,17 +1,234 @@
 import faiss
+import heapq
 import logging
 import numpy as np
 import os
 import concurrent.futures
+import threading
+from collections import Counter, OrderedDict
 from typing import List, Dict, Any, Tuple
 import string
+import sys
 from rank_bm25 import BM25Okapi
+from scipy import sparse
 
 logger = logging.getLogger(__name__)
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 _CONFIG_PATH = os.path.join(_BASE_DIR, 'config.ini')
 
 
+# HNSW breadth at query time (indices built from large corpora). Must stay
+# >= the number of neighbours requested; higher trades latency for recall.
+_HNSW_EF_SEARCH = 64
+# IVF cells probed per query (compressed indices of very large corpora).
+# Recall rises and speed falls with more probes.
+_IVF_NPROBE = 16
+# Chunk neighbours fetched per query (also the reranker's candidate pool).
+_CHUNK_TOP_K = 20
+# Two-stage (refined) indices shortlist k * _REFINE_K_FACTOR candidates by
+# compressed PQ distance, then re-score only those with the stored vectors.
+_REFINE_K_FACTOR = 4
+
+
+# Intra-op thread cap for FAISS (and torch, when the local embedding model has
+# loaded it). Past ~4 threads per-query gains flatten out, and letting every
+# pool default to one thread per core oversubscribes the CPU once FAISS, the
+# embedding model and concurrent requests run together.
+_FAISS_THREADS = int(os.getenv("DOCUAI_FAISS_THREADS", "4"))
+
+
+def apply_thread_caps(num_threads: int = None) -> int:
+    """
+    Caps FAISS (and torch, if already imported) intra-op threads.
+
+    Process-wide, so it is called by the application (API startup,
+    ``create_index``) rather than on import.
+
+    Args:
+        num_threads (int, optional): Thread cap; defaults to
+            ``DOCUAI_FAISS_THREADS`` (4). Never exceeds the core count.
+
+    Returns:
+        int: The thread count applied.
+    """
+    n = max(1, min(num_threads or _FAISS_THREADS, os.cpu_count() or 1))
+    faiss.omp_set_num_threads(n)
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(n)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only settable once, before any inter-op work has started
+            pass
+    return n
+
+
+# Query embeddings keyed on (embedding model name, query text). Embedding is
+# deterministic per model, so repeated questions skip the model entirely;
+# the model name in the key means switching models never returns stale
+# vectors. Capped at _EMBED_CACHE_MAX entries, least recently used evicted.
+_QUERY_EMBEDDING_CACHE: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+_EMBED_CACHE_MAX = 2048
+_embed_cache_lock = threading.Lock()
+_embed_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _embedding_model_id(embeddings_model: Any):
+    """Name identifying the model's vector space, or None if it has none."""
+    name = getattr(embeddings_model, 'model_name', None) or getattr(embeddings_model, 'model', None)
+    return name if isinstance(name, str) and name else None
+
+
+def _embed_query_cached(embeddings_model: Any, query: str) -> np.ndarray:
+    """
+    Embeds ``query`` as a float32 ``(1, d)`` array, reusing earlier results.
+
+    Clients without a model name are never cached, since vectors from two
+    anonymous models could not be told apart.
+    """
+    model_id = _embedding_model_id(embeddings_model)
+    key = (model_id, query)
+    if model_id is not None:
+        with _embed_cache_lock:
+            cached = _QUERY_EMBEDDING_CACHE.get(key)
+            if cached is not None:
+                _QUERY_EMBEDDING_CACHE.move_to_end(key)
+                _embed_cache_stats["hits"] += 1
+                return cached
+
+    vector = np.asarray(embeddings_model.embed_query(query), dtype='float32').reshape(1, -1)
+    if model_id is not None:
+        vector.flags.writeable = False  # shared between callers
+        with _embed_cache_lock:
+            _embed_cache_stats["misses"] += 1
+            _QUERY_EMBEDDING_CACHE[key] = vector
+            while len(_QUERY_EMBEDDING_CACHE) > _EMBED_CACHE_MAX:
+                _QUERY_EMBEDDING_CACHE.popitem(last=False)
+    return vector
+
+
+def get_query_embedding_cache_stats() -> Dict[str, int]:
+    """
+    Usage counters for the in-memory query embedding cache.
+
+    Returns:
+        Dict[str, int]: 'entries', 'hits' and 'misses'.
+    """
+    with _embed_cache_lock:
+        return {"entries": len(_QUERY_EMBEDDING_CACHE), **_embed_cache_stats}
+
+
+def clear_query_embedding_cache() -> int:
+    """
+    Drops all cached query embeddings and resets the counters.
+
+    Returns:
+        int: The number of entries removed.
+    """
+    with _embed_cache_lock:
+        count = len(_QUERY_EMBEDDING_CACHE)
+        _QUERY_EMBEDDING_CACHE.clear()
+        _embed_cache_stats.update(hits=0, misses=0)
+        return count
+
+
+# Long-lived pool for search work that overlaps the FAISS query (BM25 scoring),
+# so each query does not pay for spinning up and tearing down threads.
+_search_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="search")
+
+
+class SparseBM25(BM25Okapi):
+    """
+    ``BM25Okapi`` with query scoring on a precomputed sparse weight matrix.
+
+    ``BM25Okapi.get_scores`` walks every document's term dict in Python once
+    per query term. Here the BM25 weight of each (document, term) pair, idf
+    included, is computed once at build time into a CSC matrix, so scoring a
+    query is a column gather plus one sparse mat-vec that only touches the
+    documents containing its terms. Scores match ``BM25Okapi``.
+    """
+
+    def __init__(self, corpus, tokenizer=None, k1=1.5, b=0.75, epsilon=0.25):
+        super().__init__(corpus, tokenizer=tokenizer, k1=k1, b=b, epsilon=epsilon)
+        self._vocab = {word: col for col, word in enumerate(self.idf)}
+        rows, cols, tf = [], [], []
+        for row, freqs in enumerate(self.doc_freqs):
+            for word, freq in freqs.items():
+                rows.append(row)
+                cols.append(self._vocab[word])
+                tf.append(freq)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        tf = np.asarray(tf, dtype=np.float64)
+        idf = np.fromiter(self.idf.values(), dtype=np.float64, count=len(self.idf))
+        doc_len = np.asarray(self.doc_len, dtype=np.float64)
+        norm = self.k1 * (1 - self.b + self.b * doc_len[rows] / self.avgdl)
+        weights = idf[cols] * (tf * (self.k1 + 1) / (tf + norm))
+        self._weights = sparse.csc_matrix(
+            (weights, (rows, cols)), shape=(self.corpus_size, len(self._vocab))
+        )
+        # The matrix carries everything scoring needs; don't keep (and
+        # pickle) the per-document term dicts a second time.
+        self.doc_freqs = []
+
+    def _query_columns(self, query):
+        """Vocabulary columns of ``query`` and how often each term occurs."""
+        # Repeated query terms count once per occurrence, as in BM25Okapi
+        counts = Counter(word for word in query if word in self._vocab)
+        cols = [self._vocab[word] for word in counts]
+        return cols, np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+
+    def get_scores(self, query):
+        """BM25 score of every document for the tokenised ``query``."""
+        cols, counts = self._query_columns(query)
+        if not cols:
+            return np.zeros(self.corpus_size)
+        return self._weights[:, cols] @ counts
+
+    def get_batch_scores(self, query, doc_ids):
+        """BM25 scores of the documents ``doc_ids`` only."""
+        cols, counts = self._query_columns(query)
+        if not cols:
+            return [0.0] * len(doc_ids)
+        return (self._weights[:, cols][doc_ids] @ counts).tolist()
+
+
+def _prepare_vector_search(index: faiss.Index, query_embeddings: np.ndarray,
+                           ef_search: int, nprobe: int) -> Tuple[np.ndarray, bool]:
+    """
+    Applies the query-time parameters of ``index`` (HNSW breadth, IVF probes,
+    refine shortlist) and returns the queries in the form it expects.
+
+    Returns:
+        Tuple[np.ndarray, bool]: (queries, inner_product). For inner-product
+            indices the queries are a unit-normalised copy (cached embeddings
+            are read-only).
+    """
+    # Indices built with inner-product search hold unit vectors
+    inner_product = getattr(index, 'metric_type', None) == faiss.METRIC_INNER_PRODUCT
+    if inner_product:
+        query_embeddings = query_embeddings.copy()
+        faiss.normalize_L2(query_embeddings)
+
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = max(ef_search, _CHUNK_TOP_K)  # never below the neighbours fetched
+    elif isinstance(index, (faiss.IndexIVF, faiss.IndexPreTransform, faiss.IndexRefine)):
+        faiss.extract_index_ivf(index).nprobe = nprobe
+        if isinstance(index, faiss.IndexRefine):
+            index.k_factor = _REFINE_K_FACTOR
+    return query_embeddings, inner_product
+
+
+def _top_k_desc(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest ``scores``, highest first."""
+    if k < len(scores):
+        top = np.argpartition(scores, -k)[-k:]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(scores[top], kind='stable')[::-1]]
+
+
 class EmbeddingDimensionMismatchError(Exception):
     """
     Exception raised when the query embedding dimension differs from the FAISS index dimension.
@@ -97,7 +314,10 @@ def expand_query(query: str) -> str:
 def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str], 
            embeddings_model: Any, index_summaries: faiss.Index = None, 
            cluster_summaries: List[str] = None, cluster_map: Dict = None, 
-           bm25: BM25Okapi = None) -> Tuple[List[Dict], List[str]]:
+           bm25: BM25Okapi = None, ef_search: int = _HNSW_EF_SEARCH,
+           nprobe: int = _IVF_NPROBE,
+           query_embedding: np.ndarray = None,
+           vector_hits: Tuple[np.ndarray, np.ndarray] = None) -> Tuple[List[Dict], List[str]]:
     """
     Main entry point for hybrid semantic and keyword search.
 
@@ -120,6 +340,16 @@ def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str],
         cluster_summaries (List[str], optional): Raw summary texts.
         cluster_map (Dict, optional): Mapping of summaries to chunks.
         bm25 (BM25Okapi, optional): Pre-built keyword index.
+        ef_search (int, optional): HNSW search breadth; only applies when
+            ``index`` is an HNSW graph.
+        nprobe (int, optional): IVF cells to scan; only applies when
+            ``index`` is an IVF (e.g. OPQ+IVF+PQ) index.
+        query_embedding (np.ndarray, optional): Precomputed vector for
+            ``query`` (see ``search_many``). Ignored if query rewriting
+            changes the query text.
+        vector_hits (Tuple[np.ndarray, np.ndarray], optional): Precomputed
+            ``(distances, ids)`` of ``query_embedding`` against ``index``
+            (see ``search_many``). Ignored under the same condition.
 
     Returns:
         Tuple[List[Dict], List[str]]: (results, context_snippets)
@@ -154,8 +384,10 @@ def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str],
         if rewritten and len(rewritten) > 2:
             query = rewritten
 
-    # 1. Start Vector Search (Parallel Chunk + Summary)
-    query_embedding = np.array([embeddings_model.embed_query(query)]).astype('float32')
+    # 1. Embed the query
+    if query_embedding is None or query != original_query:
+        query_embedding = _embed_query_cached(embeddings_model, query)
+    query_embedding = np.asarray(query_embedding, dtype='float32').reshape(1, -1)
 
     # ── Dimension safety check ──────────────────────────────────────────────
     # Catch model-vs-index mismatch early rather than letting FAISS crash with
@@ -167,52 +399,62 @@ def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str],
         )
     # ───────────────────────────────────────────────────────────────────────
 
+    query_embedding, inner_product = _prepare_vector_search(index, query_embedding, ef_search, nprobe)
+
     vector_candidates = {} # idx -> score (distance)
     keyword_candidates = {} # idx -> score
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-        # Start Parallel Tasks
-        future_chunks = executor.submit(index.search, query_embedding, 20) # Top 20 direct (increased for reranker pool)
-        
-        future_summaries = None
-        if index_summaries:
-            future_summaries = executor.submit(index_summaries.search, query_embedding, 3) # Top 3 themes
-            
-        future_bm25 = None
-        if bm25:
-            # Expand query for Keyword Search to hit document sections (e.g. "Work" -> "Experience")
-            expanded_query_str = expand_query(query)
-            tokenized_query = tokenize(expanded_query_str)
-            logger.debug("[SEARCH] Expanded query terms computed")
-            future_bm25 = executor.submit(bm25.get_scores, tokenized_query)
-            
-        # Process Chunk Results
-        dists_c, idxs_c = future_chunks.result()
-        for i, idx in enumerate(idxs_c[0]):
+    # BM25 scoring overlaps the FAISS queries on the shared pool; the FAISS
+    # calls themselves run inline (they release the GIL and are sub-ms, so a
+    # thread hop per call would only add overhead).
+    future_bm25 = None
+    if bm25:
+        # Expand query for Keyword Search to hit document sections (e.g. "Work" -> "Experience")
+        expanded_query_str = expand_query(query)
+        tokenized_query = tokenize(expanded_query_str)
+        logger.debug("[SEARCH] Expanded query terms computed")
+        future_bm25 = _search_executor.submit(bm25.get_scores, tokenized_query)
+
+    # Process Chunk Results
+    if vector_hits is not None and query == original_query:
+        dists_c, idxs_c = vector_hits
+    else:
+        dists_c, idxs_c = index.search(query_embedding, _CHUNK_TOP_K) # increased for reranker pool
+    dists_c = np.asarray(dists_c[0])
+    if inner_product:
+        # Similarities -> squared L2 on unit vectors, so lower stays better
+        dists_c = 2.0 - 2.0 * dists_c
+    # One tolist() per array instead of extracting numpy scalars element by
+    # element; -1 marks FAISS padding when fewer than k vectors exist.
+    vector_candidates.update(
+        (idx, dist)
+        for idx, dist in zip(np.asarray(idxs_c[0]).tolist(), dists_c.tolist())
+        if idx != -1
+    )
+
+    # Process Summary -> Expansion
+    if index_summaries and cluster_map:
+        dists_s, idxs_s = index_summaries.search(query_embedding, 3) # Top 3 themes
+        for idx in np.asarray(idxs_s[0]).tolist():
             if idx != -1:
-                vector_candidates[int(idx)] = float(dists_c[0][i])
-        
-        # Process Keyword Results
-        if future_bm25:
-            try:
-                scores = future_bm25.result()
-                top_n = np.argsort(scores)[::-1][:20]
-                for idx in top_n:
-                    if scores[idx] > 0:
-                        keyword_candidates[int(idx)] = float(scores[idx])
-            except Exception as e:
-                logger.warning("BM25 parallel search error: %s", e)
-
-        # Process Summary -> Expansion
-        if future_summaries and cluster_map:
-            dists_s, idxs_s = future_summaries.result()
-            for i, idx in enumerate(idxs_s[0]):
-                if idx != -1:
-                    child_indices = cluster_map.get(int(idx), [])
-                    for child_idx in child_indices:
-                        if child_idx < len(docs):
-                            if int(child_idx) not in vector_candidates:
-                                vector_candidates[int(child_idx)] = 100.0 # Placeholder distance
+                child_indices = cluster_map.get(idx, [])
+                for child_idx in child_indices:
+                    if child_idx < len(docs):
+                        if int(child_idx) not in vector_candidates:
+                            vector_candidates[int(child_idx)] = 100.0 # Placeholder distance
+
+    # Process Keyword Results
+    if future_bm25:
+        try:
+            scores = np.asarray(future_bm25.result())
+            # Only the best 20 of N documents are needed: argpartition selects
+            # them in O(N), then just those 20 are sorted.
+            top_n = _top_k_desc(scores, 20)
+            top_scores = scores[top_n]
+            positive = top_scores > 0
+            keyword_candidates.update(zip(top_n[positive].tolist(), top_scores[positive].tolist()))
+        except Exception as e:
+            logger.warning("BM25 parallel search error: %s", e)
 
     # 3. Reciprocal Rank Fusion (RRF)
     # RRF Score = 1 / (k + rank)
@@ -233,6 +475,20 @@ def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str],
         if idx not in final_scores: final_scores[idx] = 0.0
         final_scores[idx] += 1 / (k + rank + 1)
 
+    # Gather text and path for every fused candidate in one pass (parallel
+    # maps keyed by chunk index); the boost and formatting stages below read
+    # these instead of unpacking each chunk dict again.
+    candidate_texts = {}
+    candidate_paths = {}
+    for idx in final_scores:
+        doc_info = docs[idx]
+        if isinstance(doc_info, dict):
+            candidate_texts[idx] = doc_info.get("text", "")
+            candidate_paths[idx] = doc_info.get("filepath", "")
+        else:
+            candidate_texts[idx] = str(doc_info)
+            candidate_paths[idx] = None
+
     # 4. Identity/Exact Match Boost
     # If a query contains a Capitalized Name (Proper Noun), massively boost documents containing it.
     # This filters for the specific person/entity requested.
@@ -243,8 +499,7 @@ def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str],
     if proper_nouns:
         logger.debug("[SEARCH] Boosting %d proper noun(s).", len(proper_nouns))
         for idx in final_scores:
-            doc_info = docs[idx]
-            doc_text = doc_info.get('text', "") if isinstance(doc_info, dict) else str(doc_info)
+            doc_text = candidate_texts[idx]
             # Check for exact case match of proper nouns in text
             for noun in proper_nouns:
                 if noun in doc_text:
@@ -256,9 +511,11 @@ def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str],
         logger.debug("[SEARCH] Applied identity boost to %d matches.", boost_count)
         
     # 5. Sort by RRF Score (Higher is better)
-    sorted_final = sorted(final_scores.items(), key=lambda x: x[1], reverse=True)
     fetch_count = 20 if do_rerank else 10 # Load a larger pool if we are going to rerank
-    top_indices = [idx for idx, score in sorted_final[:fetch_count]] 
+    # Only the top fetch_count are needed; nlargest keeps a bounded heap
+    # (same order and tie-breaking as a full descending sort + slice).
+    top_final = heapq.nlargest(fetch_count, final_scores.items(), key=lambda x: x[1])
+    top_indices = [idx for idx, score in top_final]
     logger.debug("[SEARCH] Returning top %d fused results.", len(top_indices))
     
     # 4. Format Results
@@ -269,9 +526,8 @@ def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str],
     seen_content_hashes = set()  # Track content hash to avoid near-duplicates
     
     for rank, idx in enumerate(top_indices):
-        doc_info = docs[idx]
-        doc_text = doc_info.get("text", "") if isinstance(doc_info, dict) else str(doc_info)
-        file_path = doc_info.get("filepath", "") if isinstance(doc_info, dict) else None
+        doc_text = candidate_texts[idx]
+        file_path = candidate_paths[idx]
         
         # Content hash for near-duplicate detection (first 200 chars)
         content_hash = hash(doc_text[:200].lower().strip())
@@ -330,3 +586,43 @@ def search(query: str, index: faiss.Index, docs: List[Dict], tags: List[str],
         context_snippets = context_snippets[:10]
             
     return results, context_snippets
+
+
+def search_many(queries: List[str], index: faiss.Index, docs: List[Dict], tags: List[str],
+                embeddings_model: Any, **kwargs) -> List[Tuple[List[Dict], List[str]]]:
+    """
+    Runs ``search`` for several queries with one batched FAISS query.
+
+    Each query is embedded with ``embed_query`` (through the query embedding
+    cache), exactly as ``search`` would, since query and document embeddings
+    differ for instruction-tuned models. One batched FAISS query then replaces
+    the per-query searches. Intended for evaluation / benchmark loops over
+    many questions.
+
+    Args:
+        queries (List[str]): Questions to search for.
+        index, docs, tags, embeddings_model: As for ``search``.
+        **kwargs: Any further ``search`` keyword arguments (summaries, bm25, ...).
+
+    Returns:
+        List[Tuple[List[Dict], List[str]]]: One ``(results, context_snippets)``
+            pair per query, in input order.
+    """
+    if not queries:
+        return []
+    query_embeddings = np.vstack([_embed_query_cached(embeddings_model, q) for q in queries])
+
+    vector_hits = [None] * len(queries)
+    # A dimension mismatch is left for search() to report
+    if query_embeddings.ndim == 2 and query_embeddings.shape[1] == index.d:
+        batch, _ = _prepare_vector_search(index, query_embeddings,
+                                          kwargs.get('ef_search', _HNSW_EF_SEARCH),
+                                          kwargs.get('nprobe', _IVF_NPROBE))
+        dists, ids = index.search(batch, _CHUNK_TOP_K)
+        vector_hits = [(dists[i:i + 1], ids[i:i + 1]) for i in range(len(queries))]
+
+    return [
+        search(query, index, docs, tags, embeddings_model,
+               query_embedding=query_embedding, vector_hits=hits, **kwargs)
+        for query, query_embedding, hits in zip(queries, query_embeddings, vector_hits)
+    ]
@@ -7,6 +7,12 @@ import shutil
 # Ensure backend can be imported
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from backend.tests.stubs import install_stubs
+
+# Stub missing heavy dependencies once per session, before any test module
+# (or the backend package it imports) is collected.
+install_stubs()
+
 from backend import database
 
 @pytest.fixture(scope="session", autouse=True)
@@ -38,6 +44,37 @@ def setup_test_database():
     if os.path.exists(temp_dir):
         shutil.rmtree(temp_dir, ignore_errors=True)
 
+@pytest.fixture(scope="session")
+def client():
+    """
+    One TestClient shared by every test that takes ``client``.
+
+    Not entered as a context manager, so the startup hook (index load and
+    model warm-up) never runs, same as constructing a client per test.
+    """
+    from fastapi.testclient import TestClient
+    from backend.api import app
+    return TestClient(app)
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-slow", action="store_true", default=False,
+        help="run tests marked slow (real llama_cpp model loading / inference)",
+    )
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: loads real GGUF models; skipped unless --run-slow is given")
+    # Registered here so the marker is valid with or without pytest-xdist installed
+    config.addinivalue_line("markers", "xdist_group(name): run these tests on the same pytest-xdist worker")
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow test: pass --run-slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
 def pytest_sessionstart(session):
     session.results = dict()
 
@@ -55,28 +92,18 @@ def pytest_collection_finish(session):
     session.tests_completed = 0
     print(f"\n[PROGRESS] Collected {session.total_test_count} tests.")
 
-def pytest_runtest_logreport(report):
-    # Only report progress after the "call" phase (actual test execution) is done
-    if report.when == 'call':
-        # Get the session from the plugin manager or context if possible, 
-        # but report doesn't easily link back to session variables dynamically in a clean way 
-        # without global state or using the item.
-        pass
+# Progress is reported every _PROGRESS_EVERY tests (and after the last one)
+# rather than after each test, which flooded the output with one line per test.
+_PROGRESS_EVERY = 10
 
-# Simpler approach: use pytester hook or runtest_teardown
 def pytest_runtest_teardown(item, nextitem):
     session = item.session
-    if not hasattr(session, 'tests_completed'):
-        session.tests_completed = 0
-    if not hasattr(session, 'total_test_count'):
-         # Fallback if collection hook didn't run as expected or for safety
-        session.total_test_count = len(session.items)
-        
-    session.tests_completed += 1
-    
-    percent = (session.tests_completed / session.total_test_count) * 100
-    
-    # Using sys.stdout.write to bypass capture if possible, 
-    # but pytest captures stdout. using -s or -p no:capture allows seeing this.
+    session.tests_completed = done = getattr(session, 'tests_completed', 0) + 1
+    if done % _PROGRESS_EVERY and nextitem is not None:
+        return
+    # Fallback if collection hook didn't run as expected or for safety
+    total = getattr(session, 'total_test_count', None) or len(session.items)
+
+    # pytest captures stdout; run with -s or -p no:capture to see this.
     # We'll use a specific prefix so the user sees it.
-    print(f"\n[PROGRESS] {percent:.1f}% Complete ({session.tests_completed}/{session.total_test_count}) - {item.name}")
+    print(f"\n[PROGRESS] {done / total * 100:.1f}% Complete ({done}/{total}) - {item.name}")
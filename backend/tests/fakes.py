@@ -0,0 +1,75 @@
+"""
+Lightweight hand-rolled test doubles.
+
+Plain classes exposing only what the code under test touches: they are far
+cheaper to build and call than ``MagicMock`` trees, return real numpy arrays
+(so the search path runs its actual array code), and fail loudly with an
+AttributeError if production code starts relying on something new.
+"""
+
+import hashlib
+
+import numpy as np
+
+
+class FakeIndex:
+    """
+    Stands in for a ``faiss.Index`` that returns the same neighbours for
+    every query row.
+
+    Args:
+        ids: Neighbour ids returned per query (``-1`` marks FAISS padding).
+        dists: Matching distances; zeros if omitted.
+        d (int): Vector dimension checked by ``search()``.
+    """
+
+    def __init__(self, ids, dists=None, d=128):
+        self.d = d
+        self._ids = np.asarray(ids, dtype=np.int64).reshape(1, -1)
+        if dists is None:
+            self._dists = np.zeros(self._ids.shape, dtype=np.float32)
+        else:
+            self._dists = np.asarray(dists, dtype=np.float32).reshape(1, -1)
+        self.queries = []  # every query matrix passed to search()
+
+    @property
+    def ntotal(self):
+        return int((self._ids >= 0).sum())
+
+    def search(self, queries, k):
+        self.queries.append(queries)
+        n = len(queries)
+        return (np.repeat(self._dists[:, :k], n, axis=0),
+                np.repeat(self._ids[:, :k], n, axis=0))
+
+
+class FakeEmbedder:
+    """
+    Deterministic embedder that records every text it embeds.
+
+    Vectors are derived from SHA-256 of the text, so the same text always
+    maps to the same vector. ``model_name=None`` makes the client anonymous,
+    which keeps ``search()``'s query-embedding cache out of the way.
+    """
+
+    def __init__(self, model_name="fake-model", dim=8):
+        self.model_name = model_name
+        self.dim = dim
+        self.embedded_texts = []  # embed_documents inputs, in order
+        self.queries = []         # embed_query inputs, in order
+
+    def embed_documents(self, batch):
+        self.embedded_texts.extend(batch)
+        return [self._vec(t) for t in batch]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self._vec(text)
+
+    def _vec(self, text):
+        digest = hashlib.sha256(text.encode("utf-8", "replace")).digest()
+        data = digest
+        while len(data) < self.dim:
+            digest = hashlib.sha256(digest).digest()
+            data += digest
+        return [b / 255.0 for b in data[:self.dim]]
@@ -12,19 +12,14 @@ import asyncio
 import sys
 import os
 
-# ── Stub out heavy / broken transitive dependencies before any backend import ──
-for _mod in [
-    "pypdf", "docx", "openpyxl", "pptx", "pptx.util",
-    "langchain_community", "langchain_community.llms", "langchain_community.llms.llamacpp",
-    "langchain_openai", "langchain_google_genai", "langchain_anthropic",
-    "langchain_core", "langchain_core.messages",
-    "openai", "anthropic", "google", "google.generativeai", "google.genai",
-]:
-    if _mod not in sys.modules:
-        sys.modules[_mod] = MagicMock()
-
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backend.tests.stubs import install_stubs
+
+# Stub out heavy dependencies before any backend import (no-op under pytest,
+# where conftest.py has already done this once for the session)
+install_stubs()
+
 from backend.agent import ReActAgent, _DIRECT_ANSWER_PREFIXES
 
 
@@ -141,9 +141,15 @@ class TestAgentRefactor(unittest.TestCase):
         from backend.agent import ReActAgent
         agent = ReActAgent({"config": mock_config})
 
+        def time_out(awaitable, timeout=None):
+            # The step's to_thread coroutine is never scheduled; close it so
+            # it is not reported as "never awaited" during a later test.
+            awaitable.close()
+            raise asyncio.TimeoutError
+
         async def run_timeout_test():
             events = []
-            with patch('asyncio.wait_for', side_effect=asyncio.TimeoutError):
+            with patch('asyncio.wait_for', side_effect=time_out):
                 async for event in agent.stream_chat("What is the answer?"):
                     events.append(event)
             return events
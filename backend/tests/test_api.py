@@ -119,6 +119,45 @@ class TestAPISearch(unittest.TestCase):
             self.assertIn('active_model', data)
 
 
+    @patch('backend.database.add_search_history')
+    @patch('backend.database.get_files_by_faiss_indices')
+    @patch('backend.api.cached_smart_summary')
+    @patch('backend.api.load_config')
+    @patch('backend.api.search_many')
+    @patch('backend.api.get_active_embedding_client')
+    def test_search_batch_endpoint(self, mock_get_active_client, mock_search_many, mock_load_config,
+                                   mock_smart_summary, mock_get_files_batch, mock_add_history):
+        """Batch search answers every query, in order, from one search_many call."""
+        mock_load_config.return_value.get.return_value = 'openai'
+        mock_smart_summary.return_value = "Smart Summary"
+        mock_get_files_batch.return_value = {
+            0: {'filename': 'a.pdf', 'path': '/test/a.pdf'},
+            1: {'filename': 'b.pdf', 'path': '/test/b.pdf'},
+        }
+        mock_search_many.return_value = [
+            ([{'document': 'first', 'tags': [], 'faiss_idx': 0}], []),
+            ([{'document': 'second', 'tags': [], 'faiss_idx': 1}], []),
+        ]
+
+        with patch('backend.api.index', MagicMock()), \
+             patch('backend.api.docs', []), \
+             patch('backend.api.tags', []):
+            response = self.client.post("/api/search/batch", json={
+                "queries": ["query one", "query two"]
+            })
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([r['results'][0]['file_name'] for r in data], ['a.pdf', 'b.pdf'])
+        mock_search_many.assert_called_once()
+        self.assertEqual(mock_search_many.call_args[0][0], ["query one", "query two"])
+        self.assertEqual(mock_add_history.call_count, 2)
+
+    def test_search_batch_rejects_empty_queries(self):
+        """An empty batch, or an empty query inside one, is a validation error."""
+        self.assertEqual(self.client.post("/api/search/batch", json={"queries": []}).status_code, 422)
+        self.assertEqual(self.client.post("/api/search/batch", json={"queries": ["ok", ""]}).status_code, 422)
+
     def test_search_without_index(self):
         """Test search when no index is loaded."""
         with patch('backend.api.index', None):
@@ -997,6 +1036,7 @@ class TestAPICacheEndpoints(unittest.TestCase):
         data = response.json()
         self.assertEqual(data['total_entries'], 42)
         self.assertEqual(data['total_hits'], 128)
+        self.assertIn('hits', data['query_embeddings'])
 
     @patch('backend.database.clear_response_cache')
     def test_clear_cache(self, mock_clear):
@@ -1783,8 +1823,11 @@ class TestBatch6Fixes(unittest.TestCase):
         """search_files must wrap cached_smart_summary in asyncio.to_thread."""
         import inspect
         from backend import api as api_mod
-        src = inspect.getsource(api_mod.search_files)
-        self.assertIn('asyncio.to_thread', src,
+        # Result post-processing (summaries included) lives in a helper shared
+        # with /api/search/batch
+        self.assertIn('_process_search_results', inspect.getsource(api_mod.search_files))
+        src = inspect.getsource(api_mod._process_search_results)
+        self.assertIn('asyncio.to_thread(\n                cached_smart_summary', src,
                       "search_files must call cached_smart_summary via asyncio.to_thread")
         self.assertIn('cached_smart_summary', src)
 
@@ -1969,4 +2012,4 @@ class TestIPv4Monkeypatch(unittest.TestCase):
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -691,6 +691,53 @@ class TestDatabaseBatchOperations(unittest.TestCase):
         all_files = database.get_all_files()
         self.assertGreaterEqual(len(all_files), 100)
 
+    def test_refresh_file_statistics_keeps_range_lookup_indexed(self):
+        """After ANALYZE the faiss range lookup still searches idx_files_faiss_start."""
+        from backend import database
+
+        database.add_file_rows((f'/test/stat{i}.txt', f'stat{i}.txt', '.txt', 1, 1.0, i * 10, i * 10 + 9, '[]')
+                               for i in range(200))
+        database.refresh_file_statistics()
+
+        conn = database.get_connection()
+        try:
+            self.assertIsNotNone(conn.execute(
+                "SELECT 1 FROM sqlite_stat1 WHERE tbl = 'files'").fetchone())
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM files WHERE ? BETWEEN faiss_start_idx AND faiss_end_idx",
+                (1005,)))
+        finally:
+            conn.close()
+        self.assertIn("idx_files_faiss_start", plan)
+        self.assertEqual(database.get_file_by_faiss_index(1005)['path'], '/test/stat100.txt')
+
+    def test_add_file_rows_consumes_generator(self):
+        """Positional rows in FILE_COLUMNS order insert like add_files_batch."""
+        from backend import database
+
+        rows = ((f'/test/row{i}.txt', f'row{i}.txt', '.txt', 1024, 1.0, i * 10, i * 10 + 9, '[]')
+                for i in range(50))
+        database.add_file_rows(rows)
+
+        self.assertEqual(len(database.get_all_files(limit=-1)), 50)
+        stored = database.get_file_by_path('/test/row7.txt')
+        self.assertEqual((stored['faiss_start_idx'], stored['faiss_end_idx']), (70, 79))
+
+    def test_file_by_name_uses_filename_index(self):
+        """get_file_by_name's exact match searches idx_files_filename."""
+        from backend import database
+
+        database.add_file_rows((f'/test/name{i}.txt', f'name{i}.txt', '.txt', 1, 1.0, i, i, '[]')
+                               for i in range(20))
+        conn = database.get_connection()
+        try:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM files WHERE filename = ? LIMIT 1", ('name7.txt',)))
+        finally:
+            conn.close()
+        self.assertIn("idx_files_filename", plan)
+        self.assertEqual(database.get_file_by_name('name7.txt')['path'], '/test/name7.txt')
+
 
 class TestDatabaseFileByName(unittest.TestCase):
     """Test file lookup by path functionality."""
@@ -11,13 +11,14 @@ import os
 import sys
 from unittest.mock import MagicMock
 
-# Stub out heavy dependencies before importing file_processing
-for _mod in ["pypdf", "docx", "openpyxl", "pptx", "pptx.util"]:
-    if _mod not in sys.modules:
-        sys.modules[_mod] = MagicMock()
-
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backend.tests.stubs import DOCUMENT_MODULES, install_stubs
+
+# Stub out heavy dependencies before any backend import (no-op under pytest,
+# where conftest.py has already done this once for the session)
+install_stubs(DOCUMENT_MODULES)
+
 from backend.file_processing import extract_text
 
 
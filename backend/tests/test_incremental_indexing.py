@@ -9,7 +9,6 @@ Uses REAL faiss (no module-level mocks — unlike test_indexing.py) and a
 deterministic fake embedding client, so no models are downloaded.
 """
 
-import hashlib
 import os
 import shutil
 import sys
@@ -22,6 +21,8 @@ import numpy as np
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backend.tests.fakes import FakeEmbedder
+
 
 def setUpModule():
     from backend import database
@@ -60,26 +61,6 @@ def tearDownModule():
             print(f"Warning: Could not cleanup module temp dir: {e}")
 
 
-class FakeEmbedder:
-    """Deterministic 8-dim embedder that records every text it embeds."""
-
-    def __init__(self, model_name="fake-model"):
-        self.model_name = model_name
-        self.embedded_texts = []
-
-    def embed_documents(self, batch):
-        self.embedded_texts.extend(batch)
-        return [self._vec(t) for t in batch]
-
-    def embed_query(self, text):
-        return self._vec(text)
-
-    @staticmethod
-    def _vec(text):
-        digest = hashlib.sha256(text.encode("utf-8", "replace")).digest()
-        return [b / 255.0 for b in digest[:8]]
-
-
 class TestIncrementalIndexing(unittest.TestCase):
     def setUp(self):
         from backend import database
@@ -153,13 +134,29 @@ class TestIncrementalIndexing(unittest.TestCase):
         # Index stays aligned: chunk count matches vector count
         self.assertEqual(res2[0].ntotal, len(res2[1]))
 
-        # Reused vector for a.txt must equal the original embedding
+        # Reused vector for a.txt must equal the original (unit-normalised) embedding
         a_positions = [c["faiss_idx"] for c in res2[1] if c["filepath"] == self.file_a]
         self.assertTrue(a_positions)
         reused_vec = res2[0].reconstruct(int(a_positions[0]))
-        expected_vec = np.array(FakeEmbedder._vec(res2[1][a_positions[0]]["text"]), dtype="float32")
+        expected_vec = np.array(FakeEmbedder()._vec(res2[1][a_positions[0]]["text"]), dtype="float32")
+        expected_vec /= np.linalg.norm(expected_vec)
         np.testing.assert_allclose(reused_vec, expected_vec, rtol=1e-5)
 
+    def test_renamed_file_reuses_vectors_by_content(self):
+        """A moved file fails the path/size/mtime check, but its chunks are
+        byte-identical, so their vectors are found by content hash."""
+        self._index_once(FakeEmbedder())
+        renamed = os.path.join(self.docs_dir, "a_renamed.txt")
+        os.rename(self.file_a, renamed)
+        newer = time.time() + 5
+        os.utime(renamed, (newer, newer))
+
+        second = FakeEmbedder()
+        res2 = self._index_once(second, previous=self.index_path)
+        self.assertEqual(second.embedded_texts, [])
+        self.assertIn(renamed, {c["filepath"] for c in res2[1]})
+        self.assertEqual(res2[0].ntotal, len(res2[1]))
+
     def test_model_change_forces_full_reembed(self):
         first = FakeEmbedder(model_name="fake-model")
         self._index_once(first)
@@ -176,6 +173,73 @@ class TestIncrementalIndexing(unittest.TestCase):
         self.assertIsNotNone(res[0])
         self.assertEqual(len(embedder.embedded_texts), len(res[1]))
 
+    def test_hnsw_index_supports_incremental_reuse(self):
+        """Corpora above the HNSW threshold get a graph index whose vectors
+        can still be reconstructed for incremental reuse."""
+        import faiss
+        from backend import indexing
+        with patch.object(indexing, "_HNSW_MIN_VECTORS", 1):
+            res1 = self._index_once(FakeEmbedder())
+            self.assertIsInstance(res1[0], faiss.IndexHNSWSQ)  # FP16 storage
+
+            second = FakeEmbedder()
+            res2 = self._index_once(second, previous=self.index_path)
+        self.assertIsInstance(res2[0], faiss.IndexHNSW)
+        self.assertEqual(second.embedded_texts, [])  # nothing changed, all reused
+        self.assertEqual(res2[0].ntotal, len(res2[1]))
+
+    def test_compressed_index_is_not_reused(self):
+        """Product-quantised vectors are lossy, so they must never be fed
+        back into the next index."""
+        import faiss
+        from backend import indexing
+        res = self._index_once(FakeEmbedder())
+        files = [self.file_a, self.file_b]
+        self.assertTrue(indexing._load_reusable_chunks(self.index_path, files, "fake-model"))
+
+        rng = np.random.default_rng(0)
+        compressed = faiss.index_factory(8, "IVF1,PQ4x4")
+        compressed.train(rng.random((64, 8), dtype=np.float32))
+        compressed.add(rng.random((len(res[1]), 8), dtype=np.float32))
+        faiss.write_index(compressed, self.index_path)
+
+        self.assertEqual(indexing._load_reusable_chunks(self.index_path, files, "fake-model"), {})
+
+    def test_refined_index_is_reused(self):
+        """Two-stage PQ indices reconstruct from their FP16 stage, so reuse
+        is allowed and returns those vectors."""
+        import faiss
+        from backend import indexing
+        res = self._index_once(FakeEmbedder())
+        vectors = res[0].reconstruct_n(0, res[0].ntotal)
+        refined = faiss.index_factory(8, "IVF1,PQ4x4,Refine(SQfp16)", faiss.METRIC_INNER_PRODUCT)
+        refined.train(np.random.default_rng(0).random((64, 8), dtype=np.float32))
+        refined.add(vectors)
+        faiss.write_index(refined, self.index_path)
+
+        reusable = indexing._load_reusable_chunks(self.index_path, [self.file_a, self.file_b], "fake-model")
+        self.assertEqual(sum(len(v) for v in reusable.values()), len(res[1]))
+        reused = np.array([vec for chunks in reusable.values() for _, vec in chunks])
+        np.testing.assert_allclose(np.sort(reused, axis=0), np.sort(vectors, axis=0), atol=1e-3)
+
+    @unittest.skipIf(os.name == "nt", "indices are never memory-mapped on Windows")
+    def test_mapped_index_survives_being_saved_over(self):
+        """A memory-mapped index must stay searchable when the next save
+        replaces the file it is mapped from."""
+        import faiss
+        from backend import indexing
+        res = self._index_once(FakeEmbedder())
+        with patch.object(indexing, "_MMAP_MIN_BYTES", 0):
+            mapped = indexing.load_index(self.index_path)[0]
+            query = mapped.reconstruct(0).reshape(1, -1)
+            _, before = mapped.search(query, 2)
+
+            indexing.save_index(faiss.IndexFlatIP(8), res[1], res[2], self.index_path)
+
+            _, after = mapped.search(query, 2)
+        np.testing.assert_array_equal(after, before)
+        self.assertEqual(faiss.read_index(self.index_path).ntotal, 0)
+
     def test_sidecar_records_chunker_version(self):
         from backend import indexing
         self._index_once(FakeEmbedder())
@@ -185,5 +249,35 @@ class TestIncrementalIndexing(unittest.TestCase):
         self.assertEqual(meta.get("chunker"), indexing._CHUNKER_VERSION)
 
 
+
+class TestBuildVectorIndex(unittest.TestCase):
+    def test_compressed_tier_trains_on_bounded_sample(self):
+        """The OPQ/IVF tier trains on _IVF_TRAIN_PER_CELL vectors per cell,
+        indexes every vector and leaves the caller's matrix untouched."""
+        import faiss
+        from backend import indexing
+        vectors = np.random.default_rng(0).random((1000, 8), dtype=np.float32)
+        original = vectors.copy()
+        trained_on = []
+        real_factory = faiss.index_factory
+
+        def spying_factory(*args):
+            index = real_factory(*args)
+            real_train = index.train
+            index.train = lambda x: (trained_on.append(len(x)), real_train(x))[1]
+            return index
+
+        with patch.object(indexing, "_IVFPQ_MIN_VECTORS", 1), \
+             patch.object(indexing, "_IVF_NLIST", 2), \
+             patch.object(indexing, "_PQ_M", 4), \
+             patch.object(indexing, "_IVF_TRAIN_PER_CELL", 150), \
+             patch.object(indexing.faiss, "index_factory", spying_factory):
+            index = indexing._build_vector_index(vectors)
+
+        self.assertEqual(trained_on, [300])
+        self.assertEqual(index.ntotal, 1000)
+        np.testing.assert_array_equal(vectors, original)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -21,6 +21,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Since we're mocking faiss, we need to ensure the mocks have the expected methods
 import faiss
+# Put back in tearDownModule so later modules get the real implementations
+_REAL_FAISS_ATTRS = {k: getattr(faiss, k) for k in ("IndexFlatL2", "write_index", "read_index")}
 faiss.IndexFlatL2 = MagicMock()
 faiss.write_index = MagicMock()
 faiss.read_index = MagicMock()
@@ -53,6 +55,8 @@ def setUpModule():
 
 def tearDownModule():
     from backend import database
+    for name, value in _REAL_FAISS_ATTRS.items():
+        setattr(faiss, name, value)
     # Close any open connections in this thread to allow deletion on Windows
     if hasattr(database.thread_local, "connection"):
         database.thread_local.connection.close()
@@ -119,8 +123,14 @@ class TestIndexing(unittest.TestCase):
         res = create_index(empty_folder, "openai", "fake_key")
         self.assertIsNone(res[0])
 
+    @patch('backend.indexing.faiss.write_index')
     @patch('backend.indexing.faiss.read_index')
-    def test_load_index_preserves_data(self, mock_read_index):
+    def test_load_index_preserves_data(self, mock_read_index, mock_write_index):
+        def side_effect_write(index, filepath):
+            with open(filepath, 'w') as f:
+                f.write("dummy")
+        mock_write_index.side_effect = side_effect_write
+
         # Create physical dummy files to avoid FileNotFoundError without mocking builtins.open
         index_path = os.path.join(self.temp_dir, "test.faiss")
         base_path = os.path.splitext(index_path)[0]
@@ -254,6 +264,11 @@ class TestSaveIndex(unittest.TestCase):
 
     @patch('backend.indexing.faiss.write_index')
     def test_save_index_creates_all_files(self, mock_write_index):
+        def side_effect_write(index, filepath):
+            with open(filepath, 'w') as f:
+                f.write("dummy")
+        mock_write_index.side_effect = side_effect_write
+
         import faiss
         index = faiss.IndexFlatL2(3)
         index.d = 3  # explicitly set in case faiss is globally mocked
@@ -268,12 +283,32 @@ class TestSaveIndex(unittest.TestCase):
         with open(index_path, "wb") as f: f.write(b"dummy")
         save_index(index, docs, tags, index_path)
         
-        # Since faiss.write_index is mocked, it won't actually update the file,
-        # but the sidecar files should be created by save_index.
+        # faiss.write_index is mocked, but the sidecar files should be
+        # created by save_index.
         self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "index_docs.pkl")))
         self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "index_tags.pkl")))
         self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "index_meta.json")))
 
+    @patch('backend.indexing.faiss.write_index')
+    def test_failed_write_keeps_previous_index(self, mock_write_index):
+        """A write that fails part-way leaves the old index file in place."""
+        def failing_write(index, filepath):
+            with open(filepath, 'w') as f:
+                f.write("partial")
+            raise OSError("No space left on device")
+        mock_write_index.side_effect = failing_write
+
+        index_path = os.path.join(self.temp_dir, "index.faiss")
+        with open(index_path, "w") as f:
+            f.write("previous index")
+
+        with self.assertRaises(OSError):
+            save_index(MagicMock(d=3), ["doc"], [["tag"]], index_path)
+
+        with open(index_path) as f:
+            self.assertEqual(f.read(), "previous index")
+        self.assertFalse(os.path.exists(index_path + ".tmp"))
+
 
 class TestLoadIndex(unittest.TestCase):
     """Dedicated tests for load_index function."""
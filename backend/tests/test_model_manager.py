@@ -3,22 +3,52 @@ from unittest.mock import MagicMock, patch
 import sys
 import os
 import threading
+import tempfile
+import shutil
 
 # Ensure we can import from root
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import after mocks
-from backend.model_manager import MODELS_DIR, get_download_status
+from backend.model_manager import MODELS_DIR, get_download_status, get_local_models, start_download
 import backend.model_manager as model_manager_module
 
 class TestModelManagerIntegration(unittest.TestCase):
-    @patch('backend.model_manager.requests')
-    def test_local_models_match_files(self, mock_requests):
-        # Implementation irrelevant if we just want to fix the import error
-        pass
+    # (filename, size in bytes) written once into a temporary models dir
+    LOCAL_MODEL_FILES = [("test-model.gguf", 1000), ("a.gguf", 100), ("b.gguf", 100)]
 
-    @patch('backend.model_manager.requests')
-    def test_models_directory_exists(self, mock_requests):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.temp_dir, ignore_errors=True)
+        for filename, size in cls.LOCAL_MODEL_FILES:
+            with open(os.path.join(cls.temp_dir, filename), 'wb') as f:
+                f.write(b'\0' * size)
+        # A non-model file that must be ignored
+        with open(os.path.join(cls.temp_dir, 'notes.txt'), 'w') as f:
+            f.write('not a model')
+        # A directory with a model-like name must be ignored too
+        os.mkdir(os.path.join(cls.temp_dir, 'not-a-model.gguf'))
+
+        # Patched once for the whole class rather than per test method; no
+        # test here may reach the network.
+        for patcher in (
+            patch.object(model_manager_module, 'MODELS_DIR', cls.temp_dir),
+            patch('backend.model_manager.requests', spec=True),
+        ):
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+
+    def test_local_models_match_files(self):
+        models = {m['filename']: m for m in get_local_models()}
+        self.assertEqual(len(models), len(self.LOCAL_MODEL_FILES))
+        for filename, size in self.LOCAL_MODEL_FILES:
+            with self.subTest(filename=filename):
+                self.assertIn(filename, models)
+                self.assertEqual(models[filename]['size'], size)
+                self.assertEqual(models[filename]['id'], filename[:-len('.gguf')])
+
+    def test_models_directory_exists(self):
         self.assertTrue(os.path.exists(MODELS_DIR))
 
 
@@ -61,7 +91,6 @@ class TestDownloadStatusLock(unittest.TestCase):
         original = dict(model_manager_module.download_status)
         model_manager_module.download_status['downloading'] = True
         try:
-            from backend.model_manager import start_download
             success, msg = start_download('tinyllama-1.1b-chat-v1.0.Q4_K_M')
             self.assertFalse(success)
             self.assertIn('progress', msg.lower())
@@ -69,5 +98,39 @@ class TestDownloadStatusLock(unittest.TestCase):
             model_manager_module.download_status.update(original)
 
 
+class TestLlamaThreadKwargs(unittest.TestCase):
+    def test_decode_leaves_two_cores_and_both_cap_at_sixteen(self):
+        self.assertEqual(model_manager_module.llama_thread_kwargs(8), {'n_threads': 6, 'n_threads_batch': 8})
+        self.assertEqual(model_manager_module.llama_thread_kwargs(64), {'n_threads': 16, 'n_threads_batch': 16})
+        self.assertEqual(model_manager_module.llama_thread_kwargs(2)['n_threads'], 1)
+
+    @patch('backend.model_manager.os.cpu_count', return_value=12)
+    def test_defaults_to_machine_cores(self, _):
+        self.assertEqual(model_manager_module.llama_thread_kwargs(), {'n_threads': 10, 'n_threads_batch': 12})
+
+
+class TestLlamaGpuKwargs(unittest.TestCase):
+    def _gpu_kwargs(self, supports_offload, device_count):
+        fake_llama_cpp = MagicMock()
+        fake_llama_cpp.llama_supports_gpu_offload.return_value = supports_offload
+        with patch.dict(sys.modules, {'llama_cpp': fake_llama_cpp}), \
+             patch('backend.model_manager._cuda_device_count', return_value=device_count):
+            return model_manager_module.llama_gpu_kwargs()
+
+    def test_cpu_only_build_adds_nothing(self):
+        self.assertEqual(self._gpu_kwargs(False, 2), {})
+
+    @patch.dict(os.environ, {}, clear=False)
+    def test_single_gpu_offloads_all_layers(self):
+        os.environ.pop('LLAMA_N_GPU_LAYERS', None)
+        self.assertEqual(self._gpu_kwargs(True, 1), {'n_gpu_layers': -1, 'main_gpu': 0})
+
+    @patch.dict(os.environ, {'LLAMA_N_GPU_LAYERS': '20'})
+    def test_multi_gpu_splits_evenly_and_honours_layer_override(self):
+        kwargs = self._gpu_kwargs(True, 4)
+        self.assertEqual(kwargs['n_gpu_layers'], 20)
+        self.assertEqual(kwargs['tensor_split'], [0.25] * 4)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -23,6 +23,19 @@ class TestRagOptimizers(unittest.TestCase):
         self.assertEqual(result2, "work experience london")
         self.assertEqual(mock_generate.call_count, 1) # Still 1
 
+    @patch('backend.rag_optimizers._CACHE_MAX', 2)
+    @patch('backend.rag_optimizers.generate_ai_answer')
+    def test_rewrite_query_cache_evicts_least_recently_used(self, mock_generate):
+        mock_generate.side_effect = lambda **kwargs: kwargs['question'].upper()
+
+        rewrite_query("first", "openai", "test-key", "")
+        rewrite_query("second", "openai", "test-key", "")
+        rewrite_query("first", "openai", "test-key", "")   # hit: "first" is now most recent
+        rewrite_query("third", "openai", "test-key", "")   # evicts "second"
+
+        self.assertEqual(list(_QUERY_REWRITE_CACHE), ["first", "third"])
+        self.assertEqual(mock_generate.call_count, 3)
+
     @patch('backend.rag_optimizers.generate_ai_answer')
     def test_rewrite_query_fallback_on_error(self, mock_generate):
         mock_generate.side_effect = Exception("LLM Error")
@@ -33,7 +46,7 @@ class TestRagOptimizers(unittest.TestCase):
 
     @patch('sentence_transformers.CrossEncoder')
     def test_rerank_results(self, mock_cross_encoder):
-        mock_model = MagicMock()
+        mock_model = MagicMock(spec=['predict'])
         mock_model.predict.return_value = [0.9, 0.1, 0.5] # Assuming three pairs
         mock_cross_encoder.return_value = mock_model
         
@@ -55,6 +68,13 @@ class TestRagOptimizers(unittest.TestCase):
         
         # Check that original fields are preserved
         self.assertEqual(reranked[0]['document'], 'Doc A')
+
+        # All pairs go through a single batched predict call, no progress bar
+        mock_model.predict.assert_called_once()
+        args, kwargs = mock_model.predict.call_args
+        self.assertEqual(args[0], [("test", "Doc A"), ("test", "Doc B"), ("test", "Doc C")])
+        self.assertEqual(kwargs['batch_size'], 3)
+        self.assertFalse(kwargs['show_progress_bar'])
         
     def test_rerank_results_empty(self):
         result = rerank_results("query", [], "test-model")
@@ -12,39 +12,34 @@ import sys
 import os
 import numpy as np
 
-# Stub out heavy / broken transitive dependencies before any backend import
-for _mod in [
-    "pypdf", "docx", "openpyxl", "pptx", "pptx.util",
-    "langchain_community", "langchain_community.llms", "langchain_community.llms.llamacpp",
-    "langchain_openai", "langchain_google_genai", "langchain_anthropic",
-    "langchain_core", "langchain_core.messages",
-    "openai", "anthropic", "google", "google.generativeai", "google.genai",
-]:
-    if _mod not in sys.modules:
-        sys.modules[_mod] = MagicMock()
-
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backend.tests.stubs import install_stubs
+
+# Stub out heavy dependencies before any backend import (no-op under pytest,
+# where conftest.py has already done this once for the session)
+install_stubs()
+
 from backend.search import search
 from backend import llm_integration
 
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
-def _make_index(dim=128):
+def _make_index(search_result, dim=128):
     index = MagicMock()
     index.d = dim
+    index.search.return_value = search_result
     return index
 
 
-def _make_future(dists, idxs):
-    future = MagicMock()
+def _search_result(dists, idxs):
+    """(distances, ids) pair shaped like faiss.Index.search output for one query."""
     mock_dists = MagicMock()
     mock_dists.__getitem__ = lambda self, key: dists
     mock_idxs = MagicMock()
     mock_idxs.__getitem__ = lambda self, key: idxs
-    future.result.return_value = (mock_dists, mock_idxs)
-    return future
+    return (mock_dists, mock_idxs)
 
 
 # ── Search → Context Pipeline ────────────────────────────────────────────────
@@ -58,20 +53,10 @@ class TestSearchContextPipeline(unittest.TestCase):
     def setUp(self):
         self.embeddings_model = MagicMock()
         self.embeddings_model.embed_query.return_value = [0.1] * 128
-
-        self.executor_patcher = patch("concurrent.futures.ThreadPoolExecutor")
-        mock_executor_cls = self.executor_patcher.start()
-        self.mock_executor = mock_executor_cls.return_value
-        self.mock_executor.__enter__.return_value = self.mock_executor
-
-        future = _make_future([0.15, 0.25], [0, 1])
-        self.mock_executor.submit.return_value = future
-
-    def tearDown(self):
-        self.executor_patcher.stop()
+        self.search_result = _search_result([0.15, 0.25], [0, 1])
 
     def test_search_results_contain_document_text(self):
-        index = _make_index()
+        index = _make_index(self.search_result)
         docs = [
             {"text": "Machine learning automates analytical model building.", "filepath": "/docs/ml.txt"},
             {"text": "Deep learning uses neural networks.", "filepath": "/docs/dl.txt"},
@@ -85,12 +70,11 @@ class TestSearchContextPipeline(unittest.TestCase):
         self.assertIn("Machine learning", context[0])
 
     def test_search_results_have_required_fields_for_llm(self):
-        index = _make_index()
+        index = _make_index(self.search_result)
         docs = [{"text": "Revenue grew 25% this quarter.", "filepath": "/docs/report.pdf"}]
         tags = [["finance", "revenue"]]
 
-        future = _make_future([0.1], [0])
-        self.mock_executor.submit.return_value = future
+        index.search.return_value = _search_result([0.1], [0])
 
         results, context = search("revenue growth", index, docs, tags, self.embeddings_model)
 
@@ -100,7 +84,7 @@ class TestSearchContextPipeline(unittest.TestCase):
             self.assertIn(field, result, f"Missing field: {field}")
 
     def test_context_list_matches_results_count(self):
-        index = _make_index()
+        index = _make_index(self.search_result)
         docs = [
             {"text": "First document content here.", "filepath": "/docs/a.txt"},
             {"text": "Second document content here.", "filepath": "/docs/b.txt"},
@@ -112,12 +96,11 @@ class TestSearchContextPipeline(unittest.TestCase):
         self.assertEqual(len(results), len(context))
 
     def test_search_with_bm25_augments_results(self):
-        index = _make_index()
+        index = _make_index(self.search_result)
         docs = [{"text": "quarterly financial report analysis", "filepath": "/docs/fin.pdf"}]
         tags = [["finance"]]
 
-        future = _make_future([0.2], [0])
-        self.mock_executor.submit.return_value = future
+        index.search.return_value = _search_result([0.2], [0])
 
         mock_bm25 = MagicMock()
         mock_bm25.get_scores.return_value = [8.5]
@@ -178,22 +161,12 @@ class TestEndToEndRAGFlow(unittest.TestCase):
     def setUp(self):
         self.embeddings_model = MagicMock()
         self.embeddings_model.embed_query.return_value = [0.2] * 128
-
-        self.executor_patcher = patch("concurrent.futures.ThreadPoolExecutor")
-        mock_executor_cls = self.executor_patcher.start()
-        self.mock_executor = mock_executor_cls.return_value
-        self.mock_executor.__enter__.return_value = self.mock_executor
-
-        future = _make_future([0.1], [0])
-        self.mock_executor.submit.return_value = future
-
-    def tearDown(self):
-        self.executor_patcher.stop()
+        self.search_result = _search_result([0.1], [0])
 
     @patch("backend.llm_integration.generate_ai_answer", return_value="Siddhesh studied at Symbiosis.")
     def test_full_flow_search_to_answer(self, mock_generate):
         # Step 1: Search
-        index = _make_index()
+        index = _make_index(self.search_result)
         docs = [{"text": "Siddhesh Bhurke holds an MBA from Symbiosis.", "filepath": "/docs/cv.pdf"}]
         tags = [["education", "mba"]]
 
@@ -216,12 +189,11 @@ class TestEndToEndRAGFlow(unittest.TestCase):
         self.assertEqual(answer, "Siddhesh studied at Symbiosis.")
 
     def test_empty_search_results_produce_empty_context(self):
-        index = _make_index()
+        index = _make_index(self.search_result)
         docs = []
         tags = []
 
-        future = _make_future([-1], [-1])
-        self.mock_executor.submit.return_value = future
+        index.search.return_value = _search_result([-1], [-1])
 
         results, context = search("anything", index, docs, tags, self.embeddings_model)
 
@@ -229,7 +201,7 @@ class TestEndToEndRAGFlow(unittest.TestCase):
         self.assertEqual(context, [])
 
     def test_multiple_documents_ranked_by_relevance(self):
-        index = _make_index()
+        index = _make_index(self.search_result)
         docs = [
             {"text": "Annual revenue for 2023 was $5 million.", "filepath": "/docs/annual.pdf"},
             {"text": "Marketing budget was $500k.", "filepath": "/docs/budget.pdf"},
@@ -237,8 +209,7 @@ class TestEndToEndRAGFlow(unittest.TestCase):
         ]
         tags = ["finance", "budget", "hr"]
 
-        future = _make_future([0.05, 0.15, 0.30], [0, 1, 2])
-        self.mock_executor.submit.return_value = future
+        index.search.return_value = _search_result([0.05, 0.15, 0.30], [0, 1, 2])
 
         results, context = search("revenue financial", index, docs, tags, self.embeddings_model)
 
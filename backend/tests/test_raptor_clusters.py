@@ -1,43 +1,35 @@
 import pytest
-import tempfile
-import os
 from backend import database
 
 @pytest.fixture(autouse=True)
-def setup_db():
-    # Create temp DB
-    fd, path = tempfile.mkstemp()
-    os.close(fd)
-
-    original_path = database.DATABASE_PATH
-    database.DATABASE_PATH = path
+def setup_db(tmp_path, monkeypatch):
+    # Per-test DB under pytest's tmp_path; monkeypatch restores the original
+    # path and pytest removes the directory, so no manual cleanup is needed.
+    monkeypatch.setattr(database, 'DATABASE_PATH', str(tmp_path / 'test.db'))
     database.init_database()
+    # Throwaway DB: skip the per-commit fsync
+    database.get_connection().execute("PRAGMA synchronous=OFF")
 
     yield
 
-    # Cleanup
-    os.remove(path)
-    database.DATABASE_PATH = original_path
-
 def test_raptor_clusters_crud():
     """Test Create, Read, Delete for RAPTOR clusters table."""
     # 1. Clear existing (just in case)
     database.clear_clusters()
     
-    # 2. Add clusters
-    c1_id = database.add_cluster("Cluster Summary 1", level=0)
-    c2_id = database.add_cluster("Cluster Summary 2", level=1)
+    # 2. Add clusters (one executemany transaction instead of a commit per row)
+    database.add_clusters_batch([("Cluster Summary 1", 0), ("Cluster Summary 2", 1)])
     
-    # 3. Verify IDs returned
-    assert c1_id is not None
-    assert c2_id is not None
-    assert c1_id != c2_id
-    
-    # 4. Get by level
+    # 3. Get by level
     level_0 = database.get_clusters_by_level(0)
     level_1 = database.get_clusters_by_level(1)
     level_2 = database.get_clusters_by_level(2)
     
+    # 4. Verify IDs assigned
+    assert level_0[0]['id'] is not None
+    assert level_1[0]['id'] is not None
+    assert level_0[0]['id'] != level_1[0]['id']
+    
     assert len(level_0) == 1
     assert level_0[0]['summary'] == "Cluster Summary 1"
     
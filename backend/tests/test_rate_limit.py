@@ -1,34 +1,33 @@
 import unittest
 from fastapi.testclient import TestClient
-from backend.api import app
+from backend.api import app, limiter
 
 class TestRateLimiting(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(app)
+        # Start from an empty bucket regardless of earlier tests
+        limiter.reset()
+        self.addCleanup(limiter.reset)
 
     def test_rate_limit_exceeded(self):
         """Test that making more than 100 requests in a minute triggers rate limiting."""
         # Note: The global limit is set to 100/minute.
-        # We assume clean state or at least < 100 requests from 'testclient' before this.
+        # Pre-fill the bucket straight in the limiter's in-memory storage instead
+        # of pushing 99 requests through the full ASGI stack. Keys mirror what
+        # slowapi uses: (client address, request path) under key_style="url".
+        default_limit = next(iter(limiter._default_limits[0])).limit
+        self.assertEqual(default_limit.amount, 100)
+        for _ in range(default_limit.amount - 1):
+            self.assertTrue(limiter.limiter.hit(default_limit, "testclient", "/api/health"))
 
-        # Make 100 successful requests
-        for i in range(100):
-            response = self.client.get("/api/health")
-            # If we hit limit early, print warning but fail only if it's way too early (e.g. 1)
-            # But normally it should be exactly 100.
-            if response.status_code == 429:
-                print(f"Hit rate limit early at request {i+1}")
-                # Use this as the break point
-                break
-            self.assertEqual(response.status_code, 200, f"Request {i+1} failed with {response.status_code}")
+        # The 100th request still goes through the middleware...
+        response = self.client.get("/api/health")
+        self.assertEqual(response.status_code, 200)
 
-        # The next request should fail
+        # ...and the next one is rejected
         response = self.client.get("/api/health")
         self.assertEqual(response.status_code, 429)
-        # Verify error message usually contains "Too Many Requests" or "Rate limit exceeded"
-        # slowapi default is "Rate limit exceeded" in detail or body?
-        # Standard 429 body.
-        print(f"Rate limit response: {response.text}")
+        self.assertIn("Rate limit exceeded", response.text)
 
 if __name__ == '__main__':
     unittest.main()
@@ -6,6 +6,7 @@ semantic search, keyword search, RRF fusion, and query expansion.
 """
 
 import unittest
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 import sys
 import os
@@ -17,7 +18,8 @@ import numpy as np
 # Ensure we can import from root
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.search import search, tokenize, expand_query, EmbeddingDimensionMismatchError
+from backend.tests.fakes import FakeEmbedder, FakeIndex
+from backend.search import search, search_many, tokenize, expand_query, EmbeddingDimensionMismatchError, _top_k_desc, SparseBM25
 
 
 class TestTokenization(unittest.TestCase):
@@ -95,44 +97,18 @@ class TestSearch(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
-        # Mock embeddings model
-        self.mock_embeddings_model = MagicMock()
-        # Mock ThreadPoolExecutor
-        self.mock_embeddings_model.embed_query.return_value = [0.1] * 128
-
-        self.patcher = patch('concurrent.futures.ThreadPoolExecutor')
-        self.mock_executor_cls = self.patcher.start()
-        self.mock_executor = self.mock_executor_cls.return_value
-        self.mock_executor.__enter__.return_value = self.mock_executor
-
-        # Setup common mock future behavior
-        self.mock_future = MagicMock()
-        self.mock_executor.submit.return_value = self.mock_future
-
-    def tearDown(self):
-        """Clean up test fixtures."""
-        self.patcher.stop()
+        # Anonymous (model_name=None) so the query-embedding cache stays out of the way
+        self.embedder = FakeEmbedder(model_name=None, dim=128)
 
     def test_search_basic(self):
         """Test basic search functionality."""
         query = "test query"
-        index = MagicMock()
-        index.d = 128  # Match the mocked query embedding dim
         docs = [{"text": "doc1", "filepath": "path1"}, {"text": "doc2", "filepath": "path2"}]
         tags = ["tag1", "tag2"]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-
-        # idxs[0] should be [0, 1]
-        mock_idxs.__getitem__.return_value = [0, 1]
-
-        # dists[0] should be [0.1, 0.2]
-        mock_dists.__getitem__.return_value = [0.1, 0.2]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0, 1], [0.1, 0.2])
 
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
 
         self.assertEqual(len(results), 2)
         self.assertEqual(context[0], "doc1")
@@ -141,20 +117,12 @@ class TestSearch(unittest.TestCase):
     def test_search_empty_index(self):
         """Test search with an empty index."""
         query = "test query"
-        index = MagicMock()
-        index.d = 128  # Match the mocked query embedding dim
         docs = []
         tags = []
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
+        index = FakeIndex([-1])
 
-        # idxs[0] should be [-1]
-        mock_idxs.__getitem__.return_value = [-1]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
-
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
 
         self.assertEqual(len(results), 0)
         self.assertEqual(context, [])
@@ -162,22 +130,14 @@ class TestSearch(unittest.TestCase):
     def test_search_with_bm25(self):
         """Test search with BM25 keyword search enabled."""
         query = "important document"
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "important content", "filepath": "path1"}]
         tags = ["tag1"]
 
-        mock_bm25 = MagicMock()
-        mock_bm25.get_scores.return_value = [10.5]  # High BM25 score
-
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.5]
+        mock_bm25 = SimpleNamespace(get_scores=lambda tokens: [10.5])  # High BM25 score
 
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0], [0.5])
 
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model, bm25=mock_bm25)
+        results, context = search(query, index, docs, tags, self.embedder, bm25=mock_bm25)
 
         self.assertGreater(len(results), 0)
         self.assertIn("important content", context)
@@ -185,41 +145,16 @@ class TestSearch(unittest.TestCase):
     def test_search_with_summaries(self):
         """Test search with RAPTOR cluster summaries."""
         query = "test query"
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "doc1", "filepath": "path1"}, {"text": "doc2", "filepath": "path2"}]
         tags = ["tag1", "tag2"]
 
-        index_summaries = MagicMock()
         cluster_map = {0: [0, 1]}  # Cluster 0 contains docs 0 and 1
 
-        # Mock vector search results
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.1]
-
-        # Mock summary search results
-        mock_summary_dists = MagicMock()
-        mock_summary_idxs = MagicMock()
-        mock_summary_idxs.__getitem__.return_value = [0]
-        mock_summary_dists.__getitem__.return_value = [0.05]
-
-        # Setup executor to return different results for different calls
-        call_count = [0]
-        def mock_submit(fn, *args, **kwargs):
-            future = MagicMock()
-            if call_count[0] == 0:  # First call: chunk search
-                future.result.return_value = (mock_dists, mock_idxs)
-            elif call_count[0] == 1:  # Second call: summary search
-                future.result.return_value = (mock_summary_dists, mock_summary_idxs)
-            call_count[0] += 1
-            return future
-
-        self.mock_executor.submit = mock_submit
+        index = FakeIndex([0], [0.1])
+        index_summaries = FakeIndex([0], [0.05])
 
         results, context = search(
-            query, index, docs, tags, self.mock_embeddings_model,
+            query, index, docs, tags, self.embedder,
             index_summaries=index_summaries, cluster_map=cluster_map
         )
 
@@ -228,8 +163,6 @@ class TestSearch(unittest.TestCase):
     def test_search_deduplication(self):
         """Test that search deduplicates results from same file."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         # Two docs from the same file
         docs = [
             {"text": "content from file", "filepath": "/path/same.txt"},
@@ -237,14 +170,9 @@ class TestSearch(unittest.TestCase):
         ]
         tags = ["tag1", "tag2"]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0, 1]
-        mock_dists.__getitem__.return_value = [0.1, 0.2]
+        index = FakeIndex([0, 1], [0.1, 0.2])
 
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
-
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
 
         # Should only return one result (deduplicated by file path)
         self.assertEqual(len(results), 1)
@@ -252,8 +180,6 @@ class TestSearch(unittest.TestCase):
     def test_search_content_hash_deduplication(self):
         """Test that near-duplicate content is filtered."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         # Two docs with very similar content
         docs = [
             {"text": "This is the exact same content for testing purposes", "filepath": "/path/file1.txt"},
@@ -261,14 +187,9 @@ class TestSearch(unittest.TestCase):
         ]
         tags = ["tag1", "tag2"]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0, 1]
-        mock_dists.__getitem__.return_value = [0.1, 0.2]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0, 1], [0.1, 0.2])
 
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
 
         # Should filter near-duplicate content
         self.assertLessEqual(len(results), 2)
@@ -276,22 +197,15 @@ class TestSearch(unittest.TestCase):
     def test_search_proper_noun_boost(self):
         """Test that proper nouns get boosted in search results."""
         query = "John Smith"  # Capitalized proper noun
-        index = MagicMock()
-        index.d = 128
         docs = [
             {"text": "John Smith works here", "filepath": "path1"},
             {"text": "Someone else works here", "filepath": "path2"}
         ]
         tags = ["tag1", "tag2"]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0, 1]
-        mock_dists.__getitem__.return_value = [0.5, 0.3]
+        index = FakeIndex([0, 1], [0.5, 0.3])
 
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
-
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
 
         # Should return results (proper noun boost is applied internally)
         self.assertGreater(len(results), 0)
@@ -299,19 +213,12 @@ class TestSearch(unittest.TestCase):
     def test_search_with_string_tags(self):
         """Test search when tags are strings instead of lists."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "doc1", "filepath": "path1"}]
         tags = ["comma,separated,tags"]  # String format
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.1]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0], [0.1])
 
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
 
         self.assertEqual(len(results), 1)
         # Tags should be handled correctly
@@ -320,20 +227,13 @@ class TestSearch(unittest.TestCase):
     def test_search_max_results_limit(self):
         """Test that search respects the maximum results limit."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         # Create 20 documents
         docs = [{"text": f"doc{i}", "filepath": f"path{i}"} for i in range(20)]
         tags = [f"tag{i}" for i in range(20)]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = list(range(20))
-        mock_dists.__getitem__.return_value = [0.1 * i for i in range(20)]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex(list(range(20)), [0.1 * i for i in range(20)])
 
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
 
         # Should limit to 10 results
         self.assertLessEqual(len(results), 10)
@@ -341,19 +241,12 @@ class TestSearch(unittest.TestCase):
     def test_search_returns_required_fields(self):
         """Test that search results contain all required fields."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "document content", "filepath": "/path/file.txt"}]
         tags = [["semantic", "important"]]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.1]
+        index = FakeIndex([0], [0.1])
 
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
-
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
 
         self.assertEqual(len(results), 1)
         result = results[0]
@@ -368,31 +261,94 @@ class TestSearch(unittest.TestCase):
     def test_search_without_filepath(self):
         """Test search with documents that don't have filepath."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "content without path"}]  # No filepath
         tags = ["tag1"]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.1]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0], [0.1])
 
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
         self.assertEqual(len(results), 1)
 
+    def test_search_many_embeds_queries_as_queries(self):
+        """search_many embeds with embed_query and batches the FAISS search."""
+        index = FakeIndex([0], [0.1])
+        docs = [{"text": "doc1", "filepath": "path1"}]
+        tags = ["tag1"]
+
+        batch = search_many(["first query", "second query"], index, docs, tags, self.embedder)
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch[0][1], ["doc1"])
+        self.assertEqual(self.embedder.queries, ["first query", "second query"])
+        self.assertEqual(self.embedder.embedded_texts, [])
+        # Both queries go through one batched FAISS call
+        self.assertEqual(len(index.queries), 1)
+        self.assertEqual(index.queries[0].shape, (2, 128))
+
+    def test_search_many_matches_search(self):
+        """A one-query batch ranks exactly like search() for that query."""
+        import faiss
+
+        class PrefixedEmbedder(FakeEmbedder):
+            # Instruction-tuned models embed queries differently from documents
+            def embed_query(self, text):
+                return super().embed_query("query: " + text)
+
+        embedder = PrefixedEmbedder(model_name=None, dim=16)
+        texts = [f"document number {i}" for i in range(8)]
+        index = faiss.IndexFlatIP(16)  # IndexFlatL2 is mocked out by test_indexing
+        index.add(np.asarray(embedder.embed_documents(texts), dtype="float32"))
+        docs = [{"text": t, "filepath": f"{i}.txt"} for i, t in enumerate(texts)]
+        tags = [""] * len(texts)
+
+        expected = search("document number 3", index, docs, tags, embedder)
+        (batched,) = search_many(["document number 3"], index, docs, tags, embedder)
+
+        self.assertEqual(batched, expected)
+
+    def test_search_inner_product_index_normalises_query(self):
+        """Inner-product indices get a unit-length query; the input stays untouched."""
+        import faiss
+        vectors = np.eye(2, 128, dtype="float32")
+        index = faiss.IndexFlatIP(128)
+        index.add(vectors)
+        docs = [{"text": "first", "filepath": "a.txt"}, {"text": "second", "filepath": "b.txt"}]
+        query_embedding = np.zeros((1, 128), dtype="float32")
+        query_embedding[0, 1] = 5.0  # far from unit length, points at doc 1
+
+        results, _ = search("query", index, docs, ["", ""], self.embedder,
+                            query_embedding=query_embedding)
+
+        self.assertEqual(results[0]["document"], "second")
+        self.assertEqual(query_embedding[0, 1], 5.0)
+
+    def test_search_refined_index_rescores_shortlist(self):
+        """Two-stage indices get their shortlist factor and still rank exactly."""
+        import faiss
+        from backend import search as search_module
+        rng = np.random.default_rng(0)
+        vectors = rng.random((64, 8), dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        index = faiss.index_factory(8, "IVF1,PQ2x4,Refine(SQfp16)", faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.add(vectors)
+        docs = [{"text": f"doc {i}", "filepath": f"{i}.txt"} for i in range(64)]
+
+        results, _ = search("query", index, docs, [""] * 64, self.embedder,
+                            query_embedding=vectors[17:18].copy())
+
+        self.assertEqual(index.k_factor, search_module._REFINE_K_FACTOR)
+        self.assertEqual(results[0]["document"], "doc 17")
+
     def test_search_dimension_mismatch(self):
         """Test that mismatched model/index dimensions raise EmbeddingDimensionMismatchError."""
         query = "test query"
-        index = MagicMock()
-        index.d = 768  # Different from mocked embed dim (128) — triggers guard
+        index = FakeIndex([0], d=768)  # Different from the embedder's dim (128) — triggers guard
         docs = [{"text": "doc", "filepath": "p"}]
         tags = ["t"]
 
         with self.assertRaises(EmbeddingDimensionMismatchError) as ctx:
-            search(query, index, docs, tags, self.mock_embeddings_model)
+            search(query, index, docs, tags, self.embedder)
 
         err = ctx.exception
         self.assertEqual(err.query_dim, 128)
@@ -400,47 +356,103 @@ class TestSearch(unittest.TestCase):
         self.assertIn("re-index documents", str(err))
 
 
-class TestSearchEdgeCases(unittest.TestCase):
-    """Test edge cases and boundary conditions."""
+class TestTopK(unittest.TestCase):
+    """Test cases for argpartition-based top-k selection."""
+
+    def test_matches_full_sort(self):
+        scores = np.random.default_rng(0).random(500)
+        np.testing.assert_array_equal(_top_k_desc(scores, 20), np.argsort(scores)[::-1][:20])
+
+    def test_k_larger_than_scores(self):
+        np.testing.assert_array_equal(_top_k_desc(np.array([1.0, 3.0, 2.0]), 20), [1, 2, 0])
+
+
+class TestSparseBM25(unittest.TestCase):
+    """SparseBM25 must score exactly like rank_bm25's BM25Okapi."""
+
+    CORPUS = [
+        ["python", "search", "engine"],
+        ["python", "python", "index", "faiss"],
+        ["resume", "experience", "london"],
+        [],
+        ["search", "experience", "python", "search"],
+    ]
+
+    def test_scores_match_bm25okapi(self):
+        from rank_bm25 import BM25Okapi
+        reference, sparse_bm25 = BM25Okapi(self.CORPUS), SparseBM25(self.CORPUS)
+        for query in (["python"], ["search", "search", "london"], ["unknown"], []):
+            np.testing.assert_allclose(sparse_bm25.get_scores(query), reference.get_scores(query))
+        np.testing.assert_allclose(sparse_bm25.get_batch_scores(["python", "faiss"], [4, 1]),
+                                   reference.get_batch_scores(["python", "faiss"], [4, 1]))
+
+    def test_unknown_terms_score_zero(self):
+        scores = SparseBM25(self.CORPUS).get_scores(["nothing", "here"])
+        self.assertEqual(scores.shape, (len(self.CORPUS),))
+        self.assertFalse(scores.any())
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.mock_embeddings_model = MagicMock()
-        self.mock_embeddings_model.embed_query.return_value = [0.1] * 128
 
-        # Numpy is no longer globally mocked during suite runs.
-        # The embedding now returns 128 dimensions to match index.d.
+class TestQueryEmbeddingCache(unittest.TestCase):
+    """Repeated queries reuse the cached embedding for the same model."""
 
-        self.patcher = patch('concurrent.futures.ThreadPoolExecutor')
-        self.mock_executor_cls = self.patcher.start()
-        self.mock_executor = self.mock_executor_cls.return_value
-        self.mock_executor.__enter__.return_value = self.mock_executor
+    def setUp(self):
+        from backend.search import clear_query_embedding_cache
+        clear_query_embedding_cache()
+        self.addCleanup(clear_query_embedding_cache)
+
+    def _model(self, name):
+        model = MagicMock()
+        model.model_name = name
+        model.embed_query.return_value = [0.1] * 8
+        return model
+
+    def test_repeated_query_hits_cache(self):
+        from backend.search import _embed_query_cached, get_query_embedding_cache_stats
+        model = self._model("mini-lm")
+        first = _embed_query_cached(model, "contract renewal")
+        second = _embed_query_cached(model, "contract renewal")
+
+        model.embed_query.assert_called_once_with("contract renewal")
+        self.assertIs(first, second)
+        self.assertEqual(first.shape, (1, 8))
+        self.assertEqual(get_query_embedding_cache_stats(), {"entries": 1, "hits": 1, "misses": 1})
+
+    def test_cache_is_keyed_by_model(self):
+        from backend.search import _embed_query_cached
+        model_a, model_b = self._model("model-a"), self._model("model-b")
+        _embed_query_cached(model_a, "same query")
+        _embed_query_cached(model_b, "same query")
+        model_a.embed_query.assert_called_once()
+        model_b.embed_query.assert_called_once()
+
+    def test_unnamed_model_is_not_cached(self):
+        from backend.search import _embed_query_cached, get_query_embedding_cache_stats
+        model = MagicMock(spec=['embed_query'])
+        model.embed_query.return_value = [0.1] * 8
+        _embed_query_cached(model, "query")
+        _embed_query_cached(model, "query")
+        self.assertEqual(model.embed_query.call_count, 2)
+        self.assertEqual(get_query_embedding_cache_stats()["entries"], 0)
 
-        self.mock_future = MagicMock()
-        self.mock_executor.submit.return_value = self.mock_future
 
-    def tearDown(self):
-        """Clean up test fixtures."""
-        self.patcher.stop()
+class TestSearchEdgeCases(unittest.TestCase):
+    """Test edge cases and boundary conditions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.embedder = FakeEmbedder(model_name=None, dim=128)
 
     def test_search_with_none_index_summaries(self):
         """Test search when index_summaries is None."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "doc1", "filepath": "path1"}]
         tags = ["tag1"]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.1]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0], [0.1])
 
         # Should not raise error with None summaries
         results, context = search(
-            query, index, docs, tags, self.mock_embeddings_model,
+            query, index, docs, tags, self.embedder,
             index_summaries=None, cluster_summaries=None, cluster_map=None
         )
 
@@ -449,64 +461,44 @@ class TestSearchEdgeCases(unittest.TestCase):
     def test_search_with_none_bm25(self):
         """Test search when BM25 is not available."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "doc1", "filepath": "path1"}]
         tags = ["tag1"]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.1]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0], [0.1])
 
         # Should work without BM25
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model, bm25=None)
+        results, context = search(query, index, docs, tags, self.embedder, bm25=None)
 
         self.assertEqual(len(results), 1)
 
     def test_search_with_empty_query(self):
         """Test search with empty query string."""
         query = ""
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "doc1", "filepath": "path1"}]
         tags = ["tag1"]
 
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.1]
-
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0], [0.1])
 
         # Should handle empty query
         print(f"DEBUG: type(search) is {type(search)}")
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model)
+        results, context = search(query, index, docs, tags, self.embedder)
         
         self.assertIsInstance(results, list)
 
     def test_search_bm25_error_handling(self):
         """Test that BM25 errors are handled gracefully."""
         query = "test"
-        index = MagicMock()
-        index.d = 128
         docs = [{"text": "doc1", "filepath": "path1"}]
         tags = ["tag1"]
 
-        mock_bm25 = MagicMock()
-        mock_bm25.get_scores.side_effect = Exception("BM25 error")
-
-        mock_dists = MagicMock()
-        mock_idxs = MagicMock()
-        mock_idxs.__getitem__.return_value = [0]
-        mock_dists.__getitem__.return_value = [0.1]
+        def failing_scores(tokens):
+            raise Exception("BM25 error")
+        mock_bm25 = SimpleNamespace(get_scores=failing_scores)
 
-        self.mock_future.result.return_value = (mock_dists, mock_idxs)
+        index = FakeIndex([0], [0.1])
 
         # Should not crash on BM25 error
-        results, context = search(query, index, docs, tags, self.mock_embeddings_model, bm25=mock_bm25)
+        results, context = search(query, index, docs, tags, self.embedder, bm25=mock_bm25)
 
         # Should still return vector search results
         self.assertGreater(len(results), 0)
@@ -1,107 +1,86 @@
-import unittest
 import os
-import tempfile
-import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
 from backend.model_manager import delete_model, is_safe_model_path
 
-# Mocking MODELS_DIR for the module would be tricky with unittest parallel execution.
-# However, delete_model and is_safe_path take explicit paths or use global MODELS_DIR.
-# Ideally, we should patch backend.model_manager.MODELS_DIR
 
-from unittest.mock import patch
+@pytest.fixture
+def lexical_models_dir(monkeypatch):
+    """
+    A MODELS_DIR that never exists on disk: is_safe_model_path() is pure
+    abspath/commonpath logic, so the path checks need no directory.
+    """
+    base = Path(os.path.abspath(os.sep)) / "base"
+    monkeypatch.setattr("backend.model_manager.MODELS_DIR", str(base))
+    return base
+
+
+class FakeModelsDir:
+    """In-memory stand-in for the MODELS_DIR listing that delete_model() scans."""
+
+    def __init__(self, *names):
+        self.names = set(names)
+        self.removed = []
+
+    def listdir(self, path):
+        return sorted(self.names)
+
+    def remove(self, path):
+        self.removed.append(path)
+        self.names.discard(os.path.basename(path))
+
+    def delete(self, path):
+        with patch("backend.model_manager.os.listdir", self.listdir), \
+             patch("backend.model_manager.os.remove", self.remove):
+            return delete_model(str(path))
+
+
+# (components joined onto MODELS_DIR, or None to use the literal path; literal path; expected)
+_SAFE_PATH_CASES = [
+    pytest.param(("file.txt",), None, True, id="inside"),
+    pytest.param(("test-model.gguf",), None, True, id="inside-gguf"),
+    pytest.param(("..", "sibling", "secret.txt"), None, False, id="sibling-traversal"),
+    pytest.param(("..", "windows", "system32"), None, False, id="join-traversal"),
+    pytest.param((), None, False, id="models-dir-itself"),
+    pytest.param(None, "../test.gguf", False, id="relative-traversal"),
+    pytest.param(None, "..\\test.gguf", False, id="windows-traversal"),
+    pytest.param(None, "/absolute/path.gguf", False, id="unrelated-absolute"),
+    pytest.param(None, "C:\\windows\\system32", False, id="system-path"),
+    pytest.param(None, "", False, id="empty"),
+]
+
+
+@pytest.mark.parametrize("parts, literal, expected", _SAFE_PATH_CASES)
+def test_is_safe_model_path(lexical_models_dir, parts, literal, expected):
+    """Test the path traversal prevention logic directly"""
+    # PurePath joins keep ".." components, so traversal cases stay intact
+    path = str(lexical_models_dir.joinpath(*parts)) if parts is not None else literal
+    assert is_safe_model_path(path) is expected
+
+
+def test_delete_model_valid(lexical_models_dir):
+    models = FakeModelsDir("test_model.gguf")
+
+    assert models.delete(lexical_models_dir / "test_model.gguf")
+    assert models.removed == [os.path.join(str(lexical_models_dir), "test_model.gguf")]
+
+
+@pytest.mark.parametrize("via_traversal", [False, True], ids=["direct", "traversal"])
+def test_delete_model_rejects_outside_file(lexical_models_dir, via_traversal):
+    outside_file = lexical_models_dir.parent / "elsewhere" / "outside.gguf"
+    # A model of the same name exists, so only the path check can stop the delete
+    models = FakeModelsDir("outside.gguf")
+    path = outside_file
+    if via_traversal:
+        # Reach the same file through .. components starting inside MODELS_DIR
+        path = lexical_models_dir / ".." / "elsewhere" / "outside.gguf"
+
+    assert not models.delete(path)
+    assert models.removed == []
+
 
-class TestSecurityFix(unittest.TestCase):
-    def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.patcher = patch("backend.model_manager.MODELS_DIR", self.temp_dir)
-        self.patcher.start()
-
-    def tearDown(self):
-        self.patcher.stop()
-        if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
-
-    def test_is_safe_path_valid(self):
-        file_path = os.path.join(self.temp_dir, "file.txt")
-        # Ensure base dir exists
-        self.assertTrue(is_safe_model_path(file_path))
-
-    def test_is_safe_path_traversal(self):
-        # Create a sibling directory
-        sibling_dir = self.temp_dir + "_sibling"
-        os.makedirs(sibling_dir, exist_ok=True)
-        try:
-            # Using .. to go out of base_dir
-            traversal_path = os.path.join(self.temp_dir, "..", os.path.basename(sibling_dir), "secret.txt")
-
-            # Should be False because it resolves to sibling_dir which is not under base_dir
-            self.assertFalse(is_safe_model_path(traversal_path))
-        finally:
-            if os.path.exists(sibling_dir):
-                shutil.rmtree(sibling_dir)
-
-    def test_is_safe_model_path(self):
-        """Test the path traversal prevention logic directly"""
-        import backend.model_manager as mm
-        # Safe paths: absolute paths inside MODELS_DIR (patched to self.temp_dir)
-        inside_path = os.path.join(self.temp_dir, "test-model.gguf")
-        inside_path2 = os.path.join(self.temp_dir, "some_model_v2.gguf")
-        self.assertTrue(is_safe_model_path(inside_path))
-        self.assertTrue(is_safe_model_path(inside_path2))
-
-        # Unsafe paths
-        self.assertFalse(is_safe_model_path("../test.gguf"))          # relative traversal
-        self.assertFalse(is_safe_model_path("..\\test.gguf"))          # Windows traversal
-        self.assertFalse(is_safe_model_path("/absolute/path.gguf"))    # unrelated absolute
-        self.assertFalse(is_safe_model_path("C:\\windows\\system32"))  # system path
-        self.assertFalse(is_safe_model_path(
-            os.path.join(self.temp_dir, "..", "windows", "system32")   # traversal via join
-        ))
-
-    def test_delete_model_valid(self):
-        # Create a file inside temp_models_dir
-        model_path = os.path.join(self.temp_dir, "test_model.gguf")
-        with open(model_path, "w") as f:
-            f.write("data")
-
-        self.assertTrue(delete_model(model_path))
-        self.assertFalse(os.path.exists(model_path))
-
-    def test_delete_model_outside(self):
-        # Create a file outside
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            outside_path = tmp.name
-            tmp.write(b"data")
-
-        try:
-            # Attempt to delete explicit outside path
-            self.assertFalse(delete_model(outside_path))
-            self.assertTrue(os.path.exists(outside_path))
-        finally:
-            if os.path.exists(outside_path):
-                os.remove(outside_path)
-
-    def test_delete_model_traversal(self):
-        # Create a file outside
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            outside_path = tmp.name
-            tmp.write(b"data")
-
-        try:
-            # Construct path using traversal from temp_models_dir
-            rel_path = os.path.relpath(outside_path, self.temp_dir)
-            traversal_path = os.path.join(self.temp_dir, rel_path)
-
-            # But delete_model should reject it
-            self.assertFalse(delete_model(traversal_path))
-            self.assertTrue(os.path.exists(outside_path))
-        finally:
-            if os.path.exists(outside_path):
-                os.remove(outside_path)
-
-    def test_delete_model_nonexistent(self):
-        path = os.path.join(self.temp_dir, "fake.gguf")
-        self.assertFalse(delete_model(path))
-
-if __name__ == '__main__':
-    unittest.main()
+def test_delete_model_nonexistent(lexical_models_dir):
+    assert not FakeModelsDir().delete(lexical_models_dir / "fake.gguf")
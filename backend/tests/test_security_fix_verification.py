@@ -4,11 +4,9 @@ import os
 import tempfile
 import shutil
 import json
-from unittest.mock import MagicMock
 
-# Mock missing dependencies
+import faiss
 
-# Now import the target module
 from backend.indexing import save_index, load_index
 
 class TestSecurityFixVerification(unittest.TestCase):
@@ -22,10 +20,8 @@ class TestSecurityFixVerification(unittest.TestCase):
             shutil.rmtree(self.temp_dir)
 
     def test_save_files_securely(self):
-        # Mock inputs
-        index_chunks = MagicMock()
-        index_chunks.write_index = MagicMock()
-        index_chunks.d = 128
+        # Real (empty) indices: no reliance on faiss mocks leaked by other modules
+        index_chunks = faiss.IndexFlatIP(128)
 
         all_chunks = [{'text': 'chunk1', 'filepath': 'f1', 'faiss_idx': 0, 'file_id': None}]
         tags = ['tag1']
@@ -36,7 +32,7 @@ class TestSecurityFixVerification(unittest.TestCase):
         # Call save_index
         print(f"Calling save_index with path: {self.index_path}")
         save_index(index_chunks, all_chunks, tags, self.index_path,
-                   index_summaries=MagicMock(),
+                   index_summaries=faiss.IndexFlatIP(128),
                    cluster_summaries=cluster_summaries,
                    cluster_map=cluster_map,
                    bm25=bm25)
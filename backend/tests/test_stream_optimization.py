@@ -1,29 +1,15 @@
 import unittest
 from unittest.mock import patch, MagicMock
-import sys
 from fastapi.testclient import TestClient
 
+from backend.api import app
+
 class TestStreamOptimization(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        # Patch modules before importing api
-        cls.module_patcher = patch.dict(sys.modules, {
-            'backend.search': MagicMock(),
-            'backend.llm_integration': MagicMock(),
-            'backend.database': MagicMock()
-        })
-        cls.module_patcher.start()
-
-        # Import app here safely
-        from backend.api import app
-        cls.app = app
-
-    @classmethod
-    def tearDownClass(cls):
-        cls.module_patcher.stop()
-
-    def setUp(self):
-        self.client = TestClient(self.app)
+        # One client for the class; the tests only dispatch requests and
+        # patch module globals, they never mutate the app itself.
+        cls.client = TestClient(app)
 
     @patch('backend.api.index', 'dummy_index')
     @patch('backend.api.search')
@@ -62,7 +48,8 @@ class TestStreamOptimization(unittest.TestCase):
     @patch('backend.api.summarize')
     @patch('backend.api.load_config')
     @patch('backend.api.database')
-    def test_stream_answer_without_context_calls_search(self, mock_db, mock_config, mock_summarize, mock_stream, mock_search):
+    @patch('backend.api.get_search_embedding_client')
+    def test_stream_answer_without_context_calls_search(self, mock_embedder, mock_db, mock_config, mock_summarize, mock_stream, mock_search):
         # Setup mocks
         mock_config.return_value = MagicMock()
         mock_search.return_value = ([{'document': 'doc1', 'faiss_idx': 1}], [])
@@ -36,11 +36,11 @@ class TestToolListFiles(unittest.TestCase):
 
     @patch("backend.tools.database.get_all_files")
     def test_limits_to_50_files(self, mock_get_all):
-        """Only the first 50 filenames are included."""
-        mock_get_all.return_value = [{"filename": f"file{i}.pdf"} for i in range(100)]
+        """Only the first 50 filenames are fetched from the database."""
+        mock_get_all.return_value = [{"filename": f"file{i}.pdf"} for i in range(50)]
         result = tools.tool_list_files()
-        names = result.split(", ")
-        self.assertLessEqual(len(names), 50)
+        mock_get_all.assert_called_once_with(limit=50)
+        self.assertEqual(len(result.split(", ")), 50)
 
     @patch("backend.tools.database.get_all_files")
     def test_query_param_accepted(self, mock_get_all):
@@ -73,7 +73,7 @@ class TestToolReadFile(unittest.TestCase):
         self.assertIn("Error", result)
 
     @patch("backend.tools.database.get_file_by_path")
-    @patch("backend.file_processing.extract_text")
+    @patch("backend.tools.extract_text")
     def test_reads_file_content(self, mock_extract, mock_db):
         """Returns extracted file content up to 5000 characters."""
         with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
@@ -88,7 +88,7 @@ class TestToolReadFile(unittest.TestCase):
             os.unlink(tmp_path)
 
     @patch("backend.tools.database.get_file_by_path")
-    @patch("backend.file_processing.extract_text")
+    @patch("backend.tools.extract_text")
     def test_content_capped_at_5000_chars(self, mock_extract, mock_db):
         """Content is truncated to 5000 characters max."""
         with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
@@ -103,7 +103,7 @@ class TestToolReadFile(unittest.TestCase):
             os.unlink(tmp_path)
 
     @patch("backend.tools.database.get_file_by_path")
-    @patch("backend.file_processing.extract_text")
+    @patch("backend.tools.extract_text")
     def test_empty_extracted_text_returns_message(self, mock_extract, mock_db):
         """Returns descriptive message when extracted text is empty."""
         with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
@@ -119,7 +119,7 @@ class TestToolReadFile(unittest.TestCase):
 
     @patch("backend.tools.database.get_file_by_path", return_value=None)
     @patch("backend.database.get_file_by_name", create=True)
-    @patch("backend.file_processing.extract_text")
+    @patch("backend.tools.extract_text")
     def test_fallback_to_lookup_by_name(self, mock_extract, mock_name, mock_path):
         """Falls back to get_file_by_name when get_file_by_path returns None."""
         with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
@@ -213,6 +213,19 @@ class TestToolSearchKnowledgeBase(unittest.TestCase):
         content_section = result.split("Content:")[-1]
         self.assertLessEqual(len(content_section.strip()), 510)
 
+    @patch("backend.tools.search.search")
+    @patch("backend.tools.llm_integration.get_embeddings")
+    def test_embeddings_resolved_once_per_state(self, mock_embed, mock_search):
+        """Repeated tool calls within one agent turn reuse the embeddings client."""
+        mock_search.return_value = ([], {})
+        state = self._make_state()
+
+        tools.tool_search_knowledge_base("first", state)
+        tools.tool_search_knowledge_base("second", state)
+
+        mock_embed.assert_called_once()
+        self.assertIs(mock_search.call_args_list[0][0][4], mock_search.call_args_list[1][0][4])
+
 
 class TestAvailableTools(unittest.TestCase):
     """Tests for the AVAILABLE_TOOLS registry."""
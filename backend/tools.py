@@ -26,22 +26,29 @@ def tool_search_knowledge_base(query: str, global_state: dict) -> str:
         
     cfg = global_state['config']
     provider = cfg.get('LocalLLM', 'provider', fallback='openai')
-    model_path = cfg.get('LocalLLM', 'model_path', fallback=None)
-    api_key = cfg.get('APIKeys', 'openai_api_key', fallback=None)
-    if provider == 'gemini':
-        api_key = cfg.get('APIKeys', 'gemini_api_key', fallback=api_key)
-    elif provider == 'anthropic':
-        api_key = cfg.get('APIKeys', 'anthropic_api_key', fallback=api_key)
-    elif provider == 'grok':
-        api_key = cfg.get('APIKeys', 'grok_api_key', fallback=api_key)
-    elif provider in ('ollama', 'lmstudio'):
-        api_key = cfg.get('ExternalProviders', 'external_api_key', fallback=api_key)
+    # The agent calls this tool repeatedly within one turn; resolve the
+    # embeddings client (key lookup + cache-key derivation) once per provider.
+    embeddings_cache = global_state.setdefault('_embeddings_cache', {})
+    embeddings = embeddings_cache.get(provider)
+    if embeddings is None:
+        model_path = cfg.get('LocalLLM', 'model_path', fallback=None)
+        api_key = cfg.get('APIKeys', 'openai_api_key', fallback=None)
+        if provider == 'gemini':
+            api_key = cfg.get('APIKeys', 'gemini_api_key', fallback=api_key)
+        elif provider == 'anthropic':
+            api_key = cfg.get('APIKeys', 'anthropic_api_key', fallback=api_key)
+        elif provider == 'grok':
+            api_key = cfg.get('APIKeys', 'grok_api_key', fallback=api_key)
+        elif provider in ('ollama', 'lmstudio'):
+            api_key = cfg.get('ExternalProviders', 'external_api_key', fallback=api_key)
+        embeddings = llm_integration.get_embeddings(provider, api_key=api_key, model_path=model_path)
+        embeddings_cache[provider] = embeddings
     results, _ = search.search(
         query,
         global_state['index'],
         global_state['docs'],
         global_state['tags'],
-        llm_integration.get_embeddings(provider, api_key=api_key, model_path=model_path),
+        embeddings,
         global_state.get('index_summaries'),
         global_state.get('cluster_summaries'),
         global_state.get('cluster_map'),
@@ -51,14 +58,11 @@ def tool_search_knowledge_base(query: str, global_state: dict) -> str:
     if not results:
         return "No relevant information found."
         
-    # Format results for the agent
-    summary = []
-    for r in results[:5]:
-        meta = r.get('file_name', 'unknown')
-        text = r.get('document', '')[:500] # Truncate for token efficiency
-        summary.append(f"Source: {meta}\nContent: {text}\n")
-        
-    return "\n---\n".join(summary)
+    # Format the top 5 for the agent; documents truncated for token efficiency
+    return "\n---\n".join(
+        f"Source: {r.get('file_name', 'unknown')}\nContent: {r.get('document', '')[:500]}\n"
+        for r in results[:5]
+    )
 
 def tool_read_file(file_path: str) -> str:
     """
@@ -100,7 +104,6 @@ def tool_read_file(file_path: str) -> str:
         return f"Error: File '{file_path}' found in index but does not exist on disk."
 
     try:
-        from backend.file_processing import extract_text
         text = extract_text(resolved_path)
         if not text:
             return "File is empty or could not be read."
@@ -125,7 +128,7 @@ def tool_list_files(query: str = None) -> str:
     files = database.get_all_files(limit=50)
     if not files:
         return "No files indexed."
-    return ", ".join([f['filename'] for f in files[:50]]) # Limit to 50
+    return ", ".join(f['filename'] for f in files) # The query is already limited to 50
 
 AVAILABLE_TOOLS = {
     "search_knowledge_base": tool_search_knowledge_base,
@@ -1,18 +1,64 @@
+import argparse
 import time
 import os
-import sqlite3
 from datetime import datetime
 from backend import database
 
 # Setup test database path
 database.DATABASE_PATH = 'benchmark_test.db'
-if os.path.exists(database.DATABASE_PATH):
-    os.remove(database.DATABASE_PATH)
-database.init_database()
+
+# Per-connection tuning; get_connection() already turns on WAL, the rest
+# only lives as long as the connection, so it goes on the shared one.
+TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -65536,  # ~64MB
+    'mmap_size': 268435456,  # 256MB
+}
+
+def reset_database(pragmas=None):
+    """
+    Recreates the benchmark database and applies pragmas to the thread-local
+    connection every benchmark below goes through.
+
+    Args:
+        pragmas (dict, optional): PRAGMA name -> value. Defaults to SQLite's
+            (and get_connection's) own settings.
+
+    Returns:
+        dict: The values each TUNED_PRAGMAS setting actually ended up with.
+    """
+    if hasattr(database.thread_local, "connection"):
+        database.thread_local.connection.close()
+        del database.thread_local.connection
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(database.DATABASE_PATH + suffix):
+            os.remove(database.DATABASE_PATH + suffix)
+    database.init_database()
+
+    conn = database.get_connection()
+    for name, value in (pragmas or {}).items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in TUNED_PRAGMAS}
+
+def _file_row(i, prefix, modified):
+    """One row of the files table, keyed like database._FILE_INSERT_SQL."""
+    return {
+        'path': f'/test/{prefix}/{i}.txt',
+        'filename': f'{i}.txt',
+        'file_type': '.txt',
+        'size': 1000,
+        'last_modified': modified,
+        'faiss_start_idx': i*10,
+        'faiss_end_idx': i*10+9,
+        'tags': '[]',
+    }
 
 def benchmark_single_inserts(n=1000):
     """
-    Measures the performance of adding records to the database one by one.
+    Measures the performance of adding records to the database one by one
+    through database.add_file, which commits once per row.
 
     Args:
         n (int, optional): The number of files to insert. Defaults to 1000.
@@ -20,28 +66,57 @@ def benchmark_single_inserts(n=1000):
     Returns:
         float: The total duration of the benchmark in seconds.
     """
-    print(f"Benchmarking {n} single inserts...")
+    print(f"Benchmarking {n} single inserts (autocommit per row)...")
+    modified = datetime.now().timestamp()
+    # Build rows before the timer so only the inserts are measured
+    rows = [_file_row(i, 'path', modified) for i in range(n)]
     start_time = time.time()
-    for i in range(n):
+    for row in rows:
         database.add_file(
-            path=f'/test/path/{i}.txt',
-            filename=f'{i}.txt',
-            extension='.txt',
-            size_bytes=1000,
-            modified_date=datetime.now(),
-            chunk_count=10,
-            faiss_start_idx=i*10,
-            faiss_end_idx=i*10+9
+            path=row['path'],
+            filename=row['filename'],
+            file_type=row['file_type'],
+            size=row['size'],
+            last_modified=row['last_modified'],
+            faiss_start_idx=row['faiss_start_idx'],
+            faiss_end_idx=row['faiss_end_idx']
         )
     end_time = time.time()
     duration = end_time - start_time
     print(f"Single inserts took {duration:.4f} seconds ({n/duration:.2f} inserts/sec)")
     return duration
 
+def benchmark_single_inserts_in_txn(n=1000):
+    """
+    Measures the same per-row INSERT statements as benchmark_single_inserts,
+    but wrapped in one explicit transaction, so SQLite syncs once instead of
+    once per row.
+
+    Args:
+        n (int, optional): The number of files to insert. Defaults to 1000.
+
+    Returns:
+        float: The total duration of the benchmark in seconds.
+    """
+    print(f"Benchmarking {n} single inserts (one transaction)...")
+    conn = database.get_connection()
+    modified = datetime.now().timestamp()
+    rows = [_file_row(i, 'path_txn', modified) for i in range(n)]
+    start_time = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    for row in rows:
+        conn.execute(database._FILE_INSERT_SQL, row)
+    conn.commit()
+    end_time = time.time()
+    conn.close()
+    duration = end_time - start_time
+    print(f"Single inserts in one transaction took {duration:.4f} seconds ({n/duration:.2f} inserts/sec)")
+    return duration
+
 def benchmark_batch_inserts(n=1000):
     """
     Measures the performance of adding records to the database using batch 
-    insertion (optimized chunked SQL).
+    insertion: positional tuples generated lazily into a single executemany.
 
     Args:
         n (int, optional): The number of files to insert. Defaults to 1000.
@@ -50,32 +125,71 @@ def benchmark_batch_inserts(n=1000):
         float: The total duration of the benchmark in seconds.
     """
     print(f"Benchmarking {n} batch inserts...")
-    files_to_insert = []
-    for i in range(n):
-        files_to_insert.append({
-            'path': f'/test/path_batch/{i}.txt',
-            'filename': f'{i}.txt',
-            'extension': '.txt',
-            'size_bytes': 1000,
-            'modified_date': datetime.now(),
-            'chunk_count': 10,
-            'faiss_start_idx': i*10,
-            'faiss_end_idx': i*10+9
-        })
+    modified = datetime.now().timestamp()
+    # Values in database.FILE_COLUMNS order
+    rows = ((f'/test/path_batch/{i}.txt', f'{i}.txt', '.txt', 1000, modified, i*10, i*10+9, '[]')
+            for i in range(n))
 
     start_time = time.time()
-    database.batch_add_files(files_to_insert)
+    database.add_file_rows(rows)
     end_time = time.time()
     duration = end_time - start_time
     print(f"Batch inserts took {duration:.4f} seconds ({n/duration:.2f} inserts/sec)")
     return duration
 
+def run_all(label, pragmas=None, n=1000):
+    """
+    Runs the three insert benchmarks against a fresh database.
+
+    Returns:
+        tuple: (autocommit, single transaction, executemany) durations.
+    """
+    settings = reset_database(pragmas)
+    print(f"\n=== {label}: " + ", ".join(f"{k}={v}" for k, v in settings.items()))
+    timings = (benchmark_single_inserts(n),
+               benchmark_single_inserts_in_txn(n),
+               benchmark_batch_inserts(n))
+    # What indexing does after its bulk writes; timed separately
+    start_time = time.time()
+    database.refresh_file_statistics()
+    print(f"ANALYZE + PRAGMA optimize took {time.time() - start_time:.4f} seconds")
+    return timings
+
 if __name__ == "__main__":
-    t1 = benchmark_single_inserts(1000)
-    t2 = benchmark_batch_inserts(1000)
+    parser = argparse.ArgumentParser(description="Sweep SQLite insert throughput over batch sizes.")
+    parser.add_argument("--sizes", default="100,1000,10000,100000,1000000",
+                        help="Comma-separated row counts to sweep (default: %(default)s)")
+    parser.add_argument("--pragmas", choices=("default", "tuned", "both"), default="both",
+                        help="Pragma settings to run under (default: %(default)s)")
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.sizes.split(",")]
+
+    configs = {"default": ("Default pragmas", None), "tuned": ("Tuned pragmas", TUNED_PRAGMAS)}
+    modes = ("default", "tuned") if args.pragmas == "both" else (args.pragmas,)
+
+    # Every (pragmas, N) cell starts from a fresh database so page-cache
+    # state is comparable across rungs.
+    results = {}
+    for mode in modes:
+        label, pragmas = configs[mode]
+        for n in sizes:
+            results[mode, n] = run_all(f"{label}, N={n}", pragmas, n)
+
+    for mode in modes:
+        print(f"\n{configs[mode][0]} (inserts/sec)")
+        print(f"{'N':>10} {'autocommit':>12} {'one txn':>12} {'executemany':>12} {'batch/single':>13}")
+        for n in sizes:
+            t1, t2, t3 = results[mode, n]
+            print(f"{n:>10} {n/t1:>12.0f} {n/t2:>12.0f} {n/t3:>12.0f} {t1/t3:>12.1f}x")
 
-    print(f"\nImprovement: {t1/t2:.2f}x faster")
+    if len(modes) == 2:
+        print("\nPragma tuning speedup (default time / tuned time)")
+        for n in sizes:
+            deltas = [d/t for d, t in zip(results["default", n], results["tuned", n])]
+            print(f"N={n}: autocommit {deltas[0]:.2f}x, one txn {deltas[1]:.2f}x, executemany {deltas[2]:.2f}x")
 
-    # Clean up
-    if os.path.exists(database.DATABASE_PATH):
-        os.remove(database.DATABASE_PATH)
+    # Clean up (close the thread-local connection so WAL sidecars go too)
+    database.thread_local.connection.close()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(database.DATABASE_PATH + suffix):
+            os.remove(database.DATABASE_PATH + suffix)
@@ -2,6 +2,7 @@
 import os
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from reportlab.pdfgen import canvas
 from docx import Document
 from openpyxl import Workbook
@@ -79,33 +80,43 @@ def create_synthetic_pptx():
     prs.save(path)
     print(f"Created {path}")
 
-def download_real_files():
-    """Download real files from public URLs."""
-    for filename, url in REAL_FILES_URLS.items():
-        path = os.path.join(GOLDEN_DIR, filename)
-        try:
-            print(f"Downloading {filename}...")
-            response = requests.get(url, timeout=10)
+def download_real_file(filename, url):
+    """Download one real file from a public URL."""
+    path = os.path.join(GOLDEN_DIR, filename)
+    try:
+        print(f"Downloading {filename}...")
+        # Stream to disk in 64KB chunks instead of holding the whole body
+        with requests.get(url, timeout=10, stream=True) as response:
             if response.status_code == 200:
                 with open(path, 'wb') as f:
-                    f.write(response.content)
+                    for chunk in response.iter_content(chunk_size=1 << 16):
+                        f.write(chunk)
                 print(f"Downloaded {path}")
             else:
                 print(f"Failed to download {url}: Status {response.status_code}")
-        except Exception as e:
-            print(f"Error downloading {filename}: {e}")
+    except Exception as e:
+        print(f"Error downloading {filename}: {e}")
+
+def download_real_files():
+    """Download real files from public URLs."""
+    for filename, url in REAL_FILES_URLS.items():
+        download_real_file(filename, url)
 
 if __name__ == "__main__":
     print(f"Generating Golden Dataset in {GOLDEN_DIR}...")
     ensure_dir()
-    
-    # 1. Synthetic (Precision)
-    create_synthetic_pdf()
-    create_synthetic_docx()
-    create_synthetic_xlsx()
-    create_synthetic_pptx()
-    
-    # 2. Real (Robustness)
-    download_real_files()
-    
+
+    # Every writer targets its own file and the downloads are network-bound,
+    # so run them all concurrently: total time is the slowest one.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # 1. Synthetic (Precision)
+        futures = [executor.submit(create) for create in (
+            create_synthetic_pdf, create_synthetic_docx,
+            create_synthetic_xlsx, create_synthetic_pptx)]
+        # 2. Real (Robustness)
+        futures += [executor.submit(download_real_file, filename, url)
+                    for filename, url in REAL_FILES_URLS.items()]
+        for future in as_completed(futures):
+            future.result()
+
     print("Golden Dataset generation complete.")
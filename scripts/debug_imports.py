@@ -1,23 +1,54 @@
-import time
+import re
 import sys
 import os
+import subprocess
 
-print(f"[{time.time()}] Starting import test...")
-start = time.time()
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# Mock settings to avoid side effects if needed (though we want to test real startup)
-os.environ['TEST_MODE'] = '1'
+# "import time: self [us] | cumulative | imported package" lines from -X importtime
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
 
-import backend.api
+def profile_import(statement):
+    """
+    Runs statement in a fresh interpreter under -X importtime.
 
-print(f"[{time.time()}] 'backend.api' imported in {time.time() - start:.4f}s")
-print(f"Loaded modules: {len(sys.modules)}")
+    Returns:
+        list[tuple]: (self_us, cumulative_us, depth, module) per imported module.
+    """
+    # Mock settings to avoid side effects if needed (though we want to test real startup)
+    env = {**os.environ, 'TEST_MODE': '1',
+           'PYTHONPATH': os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')]))}
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            env=env, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"'{statement}' failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cum_us, indent, module = match.groups()
+            rows.append((int(self_us), int(cum_us), len(indent) // 2, module))
+    return rows
 
-# Check for heavy modules
-heavy_modules = ['torch', 'numpy', 'llama_cpp', 'langchain', 'faiss', 'tensorflow', 'transformers']
-for m in heavy_modules:
-    detected = [name for name in sys.modules if name.startswith(m)]
-    if detected:
-        print(f"WARNING: '{m}' was imported! ({len(detected)} submodules)")
-    else:
-        print(f"OK: '{m}' was NOT imported.")
+print("Profiling 'import backend.api'...")
+baseline = {row[3] for row in profile_import('pass')}
+rows = [row for row in profile_import('import backend.api') if row[3] not in baseline]
+total_us = sum(row[0] for row in rows)
+print(f"'backend.api' imported in {total_us / 1e6:.4f}s ({len(rows)} modules loaded)")
+
+print("\nTop 20 modules by self time:")
+print(f"{'self ms':>9} {'cum ms':>9} {'% total':>8}  module")
+for self_us, cum_us, _depth, module in sorted(rows, reverse=True)[:20]:
+    print(f"{self_us / 1e3:>9.1f} {cum_us / 1e3:>9.1f} {100 * self_us / total_us:>7.1f}%  {module}")
+
+# Every top-level package backend.api pulls in, by what its import costs in
+# total: the candidates for a lazy import inside the function that needs it.
+packages = {}
+for self_us, _cum_us, _depth, module in rows:
+    top = module.partition('.')[0]
+    count, us = packages.get(top, (0, 0))
+    packages[top] = (count + 1, us + self_us)
+
+print("\nTop-level packages pulled in by backend.api (by total self time):")
+for top, (count, us) in sorted(packages.items(), key=lambda item: -item[1][1])[:20]:
+    print(f"{us / 1e3:>9.1f} ms  {top} ({count} modules)")
@@ -40,10 +40,12 @@ def debug_retrieval():
     output_path = os.path.join(PROJECT_ROOT, "data", "retrieval_debug.txt")
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(f"DEBUGGING RETRIEVAL FOR: {QUERY}\n\n")
-        for i, res in enumerate(results[:5]):
-            faiss_idx = res.get('faiss_idx')
-            file_info = database.get_file_by_faiss_index(faiss_idx) if faiss_idx is not None else None
-            filename = file_info['filename'] if file_info else "Unknown"
+        top = results[:5]
+        # One batched lookup instead of a query per result
+        files = database.get_files_by_faiss_indices(
+            [r['faiss_idx'] for r in top if r.get('faiss_idx') is not None])
+        for i, res in enumerate(top):
+            filename = files.get(res.get('faiss_idx'), {}).get('filename', "Unknown")
             
             output = f"--- Result {i+1} ---\n"
             output += f"File: {filename}\n"
@@ -1,26 +1,55 @@
+import argparse
+import subprocess
 import requests
 import time
 import sys
 
 API_URL = "http://127.0.0.1:8000/api"
 
-def check_backend():
+# One keep-alive connection for every call instead of a new socket per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+
+def start_backend():
+    """
+    Launches the backend API (uvicorn on port 8000) as a child process.
+
+    Returns:
+        subprocess.Popen: The running server; the caller terminates it.
+    """
+    print("Starting backend...")
+    return subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.api:app",
+                             "--host", "127.0.0.1", "--port", "8000"])
+
+def check_backend(proc=None, timeout=60):
     """
     Checks the availability of the backend API.
-    Attempts to connect multiple times before giving up.
+    Polls with short, growing intervals so readiness is noticed within
+    a fraction of a second instead of on the next fixed retry boundary.
+
+    Args:
+        proc (subprocess.Popen, optional): Backend started by this script;
+            if it exits, stop waiting immediately.
+        timeout (float, optional): Seconds to wait. Defaults to 60.
 
     Returns:
         bool: True if the backend responds successfully, False otherwise.
     """
     print("Waiting for backend to start...")
-    for i in range(12):  # Try for 60 seconds
+    deadline = time.monotonic() + timeout
+    delay = 0.2
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            print(f"Backend process exited with code {proc.returncode}")
+            return False
         try:
-            requests.get(f"{API_URL}/config", timeout=5)
+            SESSION.get(f"{API_URL}/config", timeout=0.5)
             print("Backend is online!")
             return True
-        except requests.RequestException:
-            print(f"Backend unavailable, retrying ({i+1}/12)...")
-            time.sleep(5)
+        except (requests.ConnectionError, requests.Timeout):
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, 2.0)
+    print(f"Backend unavailable after {timeout}s")
     return False
 
 def trigger_indexing():
@@ -32,21 +61,24 @@ def trigger_indexing():
         bool: True if indexing finished without errors, False otherwise.
     """
     print("Triggering index...")
-    requests.post(f"{API_URL}/index")
+    SESSION.post(f"{API_URL}/index")
 
-    MAX_WAIT = 300  # iterations × 2 s = 10 min
-    for _ in range(MAX_WAIT):
-        status = requests.get(f"{API_URL}/index/status").json()
+    # Poll quickly at first so short jobs finish fast, then back off so a
+    # long index costs ~65 status requests per 10 min instead of ~300.
+    deadline = time.monotonic() + 600  # 10 min
+    delay = 0.5
+    while time.monotonic() < deadline:
+        status = SESSION.get(f"{API_URL}/index/status").json()
         print(f"Progress: {status['progress']}% - {status['current_file']}")
         if not status['running']:
             if status.get('error'):
                 print(f"Indexing Error: {status['error']}")
                 return False
             return True
-        time.sleep(2)
-    else:
-        print("Indexing did not complete within the timeout.")
-        return False
+        time.sleep(delay)
+        delay = min(delay * 1.5, 10.0)
+    print("Indexing did not complete within the timeout.")
+    return False
 
 def query_system():
     """
@@ -62,7 +94,7 @@ def query_system():
     
     # Use the /api/search endpoint (non-streaming for script simplicity)
     # The user manual mentioned /api/search with AI summaries
-    resp = requests.post(f"{API_URL}/search", json={
+    resp = SESSION.post(f"{API_URL}/search", json={
         "query": query,
         "mode": "hybrid", 
         "include_summary": True
@@ -94,7 +126,7 @@ def check_history():
     Verifies that the history is being correctly persisted after an indexing operation.
     """
     print("\nChecking History...")
-    resp = requests.get(f"{API_URL}/folders/history")
+    resp = SESSION.get(f"{API_URL}/folders/history")
     folders = resp.json()
     print(f"History Folders: {folders}")
     if folders:
@@ -103,10 +135,21 @@ def check_history():
         print("❌ History empty - Verify 'mark_folder_indexed' logic.")
 
 if __name__ == "__main__":
-    if not check_backend():
-        print("Backend not running!")
-        sys.exit(1)
-        
-    if trigger_indexing():
-        check_history()
-        query_system()
+    parser = argparse.ArgumentParser(description="End-to-end check: index, history, and search.")
+    parser.add_argument("--start-backend", action="store_true",
+                        help="Launch the backend as a child process instead of using a running one")
+    args = parser.parse_args()
+
+    proc = start_backend() if args.start_backend else None
+    try:
+        if not check_backend(proc):
+            print("Backend not running!")
+            sys.exit(1)
+
+        if trigger_indexing():
+            check_history()
+            query_system()
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
@@ -2,6 +2,11 @@ import sys
 import os
 import time
 import logging
+import argparse
+import functools
+import multiprocessing
+
+import psutil
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -20,46 +25,33 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 INDEX_PATH = os.path.join(PROJECT_ROOT, 'data', 'index.faiss')
 MODELS_DIR = os.path.join(PROJECT_ROOT, 'models')
 
-def run_comparison():
+@functools.lru_cache(maxsize=1)
+def _load_retrieval(index_path):
     """
-    Executes a benchmark comparing retrieval quality and generation speed across 
-    all locally downloaded models.
+    Loads the FAISS index bundle and the local embedding model once per
+    process, so every query in a run shares them.
 
-    This benchmark script:
-    1. Loads the FAISS index and performs a retrieval check to ensure the 
-       search-relevant context is being found.
-    2. Iterates through all GGUF models in the 'models/' directory.
-    3. For each model, it measures:
-        - Load/Cache readiness time.
-        - Generation time (tokens per second proxy).
-        - Quality of the synthesized answer based on the retrieved context.
+    Returns:
+        tuple: (index, docs, tags, index_summaries, cluster_summaries,
+            cluster_map, bm25, embeddings).
     """
-    print(f"\n{'='*60}")
-    print(f"BENCHMARK: {QUERY}")
-    print(f"{'='*60}\n")
+    res = load_index(index_path)
+    print("Loading embeddings...")
+    return (*res[:7], get_embeddings(provider='local'))
 
-    # 1. Test Retrieval First
-    print("--- Step 1: Testing Retrieval (Context) ---")
-    if not os.path.exists(INDEX_PATH):
-        print("ERROR: Index not found!")
-        return
+def _retrieve_context(query, retrieval):
+    """
+    Runs the search for one query and prints the top 3 chunks it found.
 
-    # Load index
-    try:
-        res = load_index(INDEX_PATH)
-        index, docs, tags, index_summaries, cluster_summaries, cluster_map, bm25 = res[:7]
-    except Exception as e:
-        print(f"Error loading index: {e}")
-        return
+    Returns:
+        str: The context block every model is prompted with.
+    """
+    index, docs, tags, index_summaries, cluster_summaries, cluster_map, bm25, embeddings = retrieval
 
-    # Get local embeddings
-    print("Loading embeddings...")
-    embeddings = get_embeddings(provider='local')
-    
     # Run search
     start_t = time.time()
     results, context_snippets = search(
-        QUERY, index, docs, tags, embeddings,
+        query, index, docs, tags, embeddings,
         index_summaries, cluster_summaries, cluster_map, bm25
     )
     search_time = time.time() - start_t
@@ -74,13 +66,13 @@ def run_comparison():
     # But for this test, let's just show the raw retrieval to see if 'Siddhesh' is even there.
     full_context_text = ""
     
-    for i, res in enumerate(results[:3]):
+    top = results[:3]
+    # search returns 'faiss_idx'; resolve all files in one batched lookup
+    files = database.get_files_by_faiss_indices(
+        [r['faiss_idx'] for r in top if r.get('faiss_idx') is not None])
+    for i, res in enumerate(top):
         doc_text = res['document']
-        # Try to find file path if possible (reverse lookup loop or similar? unavailable here easily without db)
-        # Actually search returns 'faiss_idx', we can use database
-        faiss_idx = res.get('faiss_idx')
-        file_info = database.get_file_by_faiss_index(faiss_idx) if faiss_idx is not None else None
-        filename = file_info['filename'] if file_info else "Unknown"
+        filename = files.get(res.get('faiss_idx'), {}).get('filename', "Unknown")
         
         print(f"\n[Result {i+1}] (File: {filename}) (Rank: {i+1})")
         print(f"Content snippet: {doc_text[:300]}...")
@@ -93,78 +85,159 @@ def run_comparison():
             print(">>> ⚠️ Neither name found explicitly in top snippet")
 
         full_context_text += f"Document {i+1} (from {filename}):\n{doc_text}\n\n"
+    return full_context_text
 
-    print("\n" + "="*60)
-    print("--- Step 2: Testing Models (Generation) ---")
-    print("Using retrieved context for all models to ensure fair comparison.")
-    print("="*60)
+def run_comparison(queries=(QUERY,), parallel=False):
+    """
+    Executes a benchmark comparing retrieval quality and generation speed across 
+    all locally downloaded models.
 
+    This benchmark script:
+    1. Loads the FAISS index and performs a retrieval check to ensure the 
+       search-relevant context is being found.
+    2. Iterates through all GGUF models in the 'models/' directory.
+    3. For each model, it measures:
+        - Load/Cache readiness time.
+        - Generation time (tokens per second proxy).
+        - Quality of the synthesized answer based on the retrieved context.
+       Models are benchmarked one at a time. With parallel=True they run in
+       worker processes instead when there is enough free RAM for all of
+       them; their generation times are then measured under contention.
+
+    The index, embedding model and worker pool are set up once and shared
+    by every query in queries, so a batch of queries pays load costs once.
+    """
     # Find available models
     model_files = [f for f in os.listdir(MODELS_DIR) if f.endswith('.gguf')]
     if not model_files:
         print("No local models found in models/ directory.")
         return
+    model_paths = [os.path.join(MODELS_DIR, f) for f in model_files]
 
-    for model_file in model_files:
-        model_path = os.path.join(MODELS_DIR, model_file)
-        print(f"\nTesting Model: {model_file}")
+    if not os.path.exists(INDEX_PATH):
+        print("ERROR: Index not found!")
+        return
+    try:
+        retrieval = _load_retrieval(INDEX_PATH)
+    except Exception as e:
+        print(f"Error loading index: {e}")
+        return
+
+    # With --parallel, load models side by side when RAM allows, so wall-clock
+    # is the slowest model's load + generate rather than the sum. Generation
+    # then shares CPU cores, so those timings are not isolated per model.
+    workers = min(len(model_paths), max(1, (os.cpu_count() or 2) // 2))
+    needed = sum(os.path.getsize(p) for p in model_paths)
+    pool = None
+    if parallel and workers > 1 and psutil.virtual_memory().available >= needed:
+        print(f"Benchmarking {len(model_paths)} models in {workers} worker processes")
+        pool = multiprocessing.get_context('spawn').Pool(workers)
+
+    try:
+        for query in queries:
+            print(f"\n{'='*60}")
+            print(f"BENCHMARK: {query}")
+            print(f"{'='*60}\n")
+
+            # 1. Test Retrieval First
+            print("--- Step 1: Testing Retrieval (Context) ---")
+            full_context_text = _retrieve_context(query, retrieval)
+
+            print("\n" + "="*60)
+            print("--- Step 2: Testing Models (Generation) ---")
+            print("Using retrieved context for all models to ensure fair comparison.")
+            print("="*60)
+
+            jobs = [(path, full_context_text, query) for path in model_paths]
+            if pool is not None:
+                results = pool.starmap(_bench_one, jobs)
+            else:
+                results = [_bench_one(*job) for job in jobs]
+            _print_results(results, contended=pool is not None)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+def _print_results(results, contended=False):
+    """
+    Prints one block per model from _bench_one() result dicts. With
+    contended=True the timings are marked as taken while models ran in parallel.
+    """
+    note = " (contended: models ran in parallel)" if contended else ""
+    for result in results:
+        print(f"\nTesting Model: {result['model']}")
         print("-" * 30)
+        if result.get('error'):
+            print(f"Error testing model: {result['error']}")
+            continue
+        print(f"Load/Cache Check Time: {result['load_time']:.4f}s{note}")
+        if result['response'] is None:
+            print("Failed to load model.")
+            continue
+        print(f"Generation Time: {colors.GREEN}{result['gen_time']:.2f}s{colors.RESET}{note}")
+        print(f"Response: {result['response']}\n")
+
+def _bench_one(model_path, full_context_text, query):
+    """
+    Loads one GGUF model and times a single answer over the shared context.
+    Top-level so it can run in a spawned worker process.
 
-        # Force unload/reload to test initialization time
-        # Note: In real app, we cache.
-        
-        try:
-            # Measure generation
-            start_gen = time.time()
-            
-            # We call generate_ai_answer directly, utilizing the 'local' provider path logic
-            # modifying client cache key or logic to force specific model would be tricky if we rely on config
-            # So we will instantiate the client directly using helper
-            
-            # 1. Get Client (Load Time)
-            t0 = time.time()
-            # We manually bypass get_llm_client caching slightly or just accept it (warmup)
-            # Actually, let's use the lower level get_local_llm to ensure we test THIS specific file
-            from backend.llm_integration import get_local_llm, _llm_cache, _local_llm_lock
-            
-            # Clear cache for this model to test fresh load? Or test cached speed?
-            # User complains about "response time" -> usually includes generation. 
-            # Load time only happens once. We should test WARM generation.
-            
-            llm = get_local_llm(model_path)
-            load_time = time.time() - t0
-            print(f"Load/Cache Check Time: {load_time:.4f}s")
-            
-            if not llm:
-                print("Failed to load model.")
-                continue
-
-            # 2. Generate
-            prompt = f"Context:\n{full_context_text}\n\nQuestion: {QUERY}\nAnswer:"
-            
-            t1 = time.time()
-            with _local_llm_lock:
-                 output = llm.create_completion(
-                    prompt,
-                    max_tokens=256,
-                    stop=["Question:", "Context:"],
-                    echo=False,
-                    temperature=0.1 
-                )
-            gen_time = time.time() - t1
-            response = output['choices'][0]['text'].strip()
-            
-            print(f"Generation Time: {colors.GREEN}{gen_time:.2f}s{colors.RESET}")
-            print(f"Response: {response}\n")
-            
-        except Exception as e:
-            print(f"Error testing model: {e}")
+    Returns:
+        dict: model, load_time, gen_time, response (None if the model failed
+            to load) and error (set if anything raised).
+    """
+    result = {'model': os.path.basename(model_path), 'load_time': None,
+              'gen_time': None, 'response': None, 'error': None}
+    try:
+        from backend.llm_integration import _local_llm_lock
+
+        # 1. Get Client (Load Time) for THIS specific file
+        t0 = time.time()
+        llm = get_local_llm(model_path)
+        result['load_time'] = time.time() - t0
+        if not llm:
+            return result
+
+        # 2. Generate
+        prompt = f"Context:\n{full_context_text}\n\nQuestion: {query}\nAnswer:"
+
+        t1 = time.time()
+        with _local_llm_lock:
+            output = llm.create_completion(
+                prompt,
+                max_tokens=256,
+                stop=["Question:", "Context:"],
+                echo=False,
+                temperature=0.1
+            )
+        result['gen_time'] = time.time() - t1
+        result['response'] = output['choices'][0]['text'].strip()
+    except Exception as e:
+        result['error'] = str(e)
+    return result
 
 class colors:
     GREEN = '\033[92m'
     RESET = '\033[0m'
 
+if not sys.stdout.isatty() or os.environ.get("NO_COLOR"):
+    colors.GREEN = colors.RESET = ''
+
 if __name__ == "__main__":
     # Ensure DB is init
+    parser = argparse.ArgumentParser(description="Compare local GGUF models on retrieval queries.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Benchmark models side by side when RAM allows; faster, "
+                             "but timings are measured under contention")
+    parser.add_argument("--queries-file",
+                        help="Text file with one query per line, all run against the same loaded index")
+    cli_args = parser.parse_args()
+
+    queries = (QUERY,)
+    if cli_args.queries_file:
+        with open(cli_args.queries_file, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
     database.init_database()
-    run_comparison()
+    run_comparison(queries, parallel=cli_args.parallel)
@@ -5,16 +5,42 @@ paths = [
     r"C:\Users\siddh\Desktop\Resume"
 ]
 
+def count_files(root, sample=3):
+    """
+    Counts files under root without building a list of every filename.
+    Classifies entries the way os.walk does (directory symlinks are not
+    descended into, everything else counts as a file).
+
+    Returns:
+        tuple: (file count, up to `sample` filenames found first).
+    """
+    count = 0
+    sample_names = []
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                    continue
+                count += 1
+                if len(sample_names) < sample:
+                    sample_names.append(entry.name)
+    return count, sample_names
+
 print("Checking paths:")
 for p in paths:
     print(f"\nPath: {p}")
     if os.path.exists(p):
         print(f"  Exists: Yes")
-        files = []
-        for _, _, filenames in os.walk(p):
-            files.extend(filenames)
-        print(f"  Files found via os.walk: {len(files)}")
-        if files:
-            print(f"  First 3 files: {files[:3]}")
+        count, first_files = count_files(p)
+        print(f"  Files found: {count}")
+        if first_files:
+            print(f"  First 3 files: {first_files}")
     else:
         print(f"  Exists: No")
@@ -10,6 +10,7 @@ Usage:
     python run_tests.py --quick      # Run quick tests only (skip slow model tests)
     python run_tests.py --verbose    # Extra verbose output
     python run_tests.py --coverage   # Run with coverage report (requires pytest-cov)
+    python run_tests.py --quick -j 4 # Run test modules in 4 worker processes
 """
 
 import unittest
@@ -19,6 +20,10 @@ import argparse
 import time
 import tempfile
 import shutil
+import fnmatch
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add the workspace directory (project root) to the Python path
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -37,6 +42,11 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+# Escape codes are noise in redirected output (CI logs, --parallel workers)
+if not sys.stdout.isatty() or os.environ.get("NO_COLOR"):
+    for _attr in ('HEADER', 'BLUE', 'GREEN', 'YELLOW', 'RED', 'CYAN', 'ENDC', 'BOLD'):
+        setattr(Colors, _attr, '')
+
 def print_header(text):
     """
     Print a colored header to the console for visual separation of test phases.
@@ -49,8 +59,13 @@ def print_header(text):
     print(f"{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.ENDC}\n")
 
 
+BAR_WIDTH = 30
+
 class ProgressTestResult(unittest.TestResult):
     """Custom TestResult that shows a progress bar and current test name."""
+
+    # Every bar state, indexed by filled width, built once
+    _BARS = ['#' * filled + '-' * (BAR_WIDTH - filled) for filled in range(BAR_WIDTH + 1)]
     
     def __init__(self, total_tests, stream=sys.stdout):
         """
@@ -65,32 +80,55 @@ class ProgressTestResult(unittest.TestResult):
         self.current_test = 0
         self.stream = stream
         self.passed = 0
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
+        self._last_draw = 0.0
+        isatty = getattr(stream, "isatty", None)
+        self._in_place = bool(isatty and isatty())
+        # Fixed pieces of every progress line, formatted once
+        self._prefix = ("\r" if self._in_place else "") + f"{Colors.CYAN}["
+        self._statuses = {}
+        self._line_open = False
         
     def _print_progress(self, status_char, test_name, color=Colors.GREEN):
         """Print progress bar with current test info."""
         self.current_test += 1
+        last = self.current_test == self.total_tests
+        now = time.monotonic()
+        # On a terminal a passing test within 50ms of the last redraw would be
+        # overwritten before anyone could read it; skip building that line.
+        if (self._in_place and status_char == 'OK' and not last
+                and now - self._last_draw < 0.05):
+            return
+        self._last_draw = now
         percentage = (self.current_test / self.total_tests) * 100
-        bar_width = 30
-        filled = int(bar_width * self.current_test / self.total_tests)
-        bar = '#' * filled + '-' * (bar_width - filled)
+        bar = self._BARS[BAR_WIDTH * self.current_test // self.total_tests]
         
         # Get short test name
         short_name = str(test_name).split(' ')[0]
         if len(short_name) > 40:
             short_name = short_name[:37] + '...'
         
-        elapsed = time.time() - self.start_time
+        elapsed = now - self.start_time
         
-        # Print progress line
-        self.stream.write(f"\r{Colors.CYAN}[{bar}] {percentage:5.1f}%{Colors.ENDC} ")
-        self.stream.write(f"({self.current_test}/{self.total_tests}) ")
-        self.stream.write(f"{color}{status_char}{Colors.ENDC} ")
-        self.stream.write(f"{short_name:<45} ")
-        self.stream.write(f"[{elapsed:.1f}s]")
-        self.stream.write(" " * 10)  # Clear any leftover chars
-        self.stream.write("\n")
-        self.stream.flush()
+        # One write per update. On a terminal, passing tests overwrite the
+        # same line; failures, errors and the final test keep their line.
+        # Piped output (CI logs) gets a line per test, as \r would merge them.
+        keep_line = status_char in ('FAIL', 'E') or last or not self._in_place
+        status = self._statuses.get(status_char)
+        if status is None:
+            status = self._statuses[status_char] = f"{color}{status_char}{Colors.ENDC}"
+        self.stream.write(
+            f"{self._prefix}{bar}] {percentage:5.1f}%{Colors.ENDC} "
+            f"({self.current_test}/{self.total_tests}) "
+            f"{status} "
+            f"{short_name:<45} "
+            f"[{elapsed:.1f}s]"
+            + " " * 10  # Clear any leftover chars
+            + ("\n" if keep_line else "")
+        )
+        self._line_open = not keep_line
+        if self.current_test % 10 == 0 or status_char != 'OK' or last:
+            self.stream.flush()
         
     def startTest(self, test):
         super().startTest(test)
@@ -130,10 +168,47 @@ class ProgressTestRunner:
         
         # Run tests
         suite(result)
+        if result._line_open:
+            # Fewer progress updates than counted cases (e.g. expected failures)
+            self.stream.write("\n")
+        self.stream.flush()
         
         return result
 
 
+# All test modules except slow ones
+QUICK_MODULES = [
+    'backend.tests.test_api',
+    'backend.tests.test_database',
+    'backend.tests.test_file_processing',
+    'backend.tests.test_indexing',
+    'backend.tests.test_incremental_indexing',
+    'backend.tests.test_stream_optimization',
+    'backend.tests.test_search',
+    'backend.tests.test_model_manager',
+    'backend.tests.test_benchmarks',
+    'backend.tests.test_config_and_edge_cases',
+    'backend.tests.test_security',
+    'backend.tests.test_rate_limit',
+    # New coverage additions
+    'backend.tests.test_agent',
+    'backend.tests.test_extraction',
+    'backend.tests.test_rag_pipeline',
+]
+
+# Modules that read back the shared config.ini they write; under --parallel
+# they run one after another in a single worker so they never interleave.
+SHARED_CONFIG_MODULES = {
+    'backend.tests.test_api',
+    'backend.tests.test_auth',
+    'backend.tests.test_background',
+    'backend.tests.test_config_and_edge_cases',
+    'backend.tests.test_config_cache',
+    'backend.tests.test_settings',
+}
+
+RESULT_MARKER = '__RUN_TESTS_RESULT__ '
+
 def run_quick_tests():
     """
     Assembles a test suite containing only fast-running unit tests.
@@ -143,30 +218,22 @@ def run_quick_tests():
     Returns:
         unittest.TestSuite: A suite of quick unit tests.
     """
+    return load_modules(QUICK_MODULES)
+
+def load_modules(modules):
+    """
+    Builds a suite from dotted test module names, warning on any that fail to load.
+
+    Args:
+        modules (list[str]): Module names such as 'backend.tests.test_api'.
+
+    Returns:
+        unittest.TestSuite: The loaded tests.
+    """
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
-    
-    # Add all test modules except slow ones
-    quick_modules = [
-        'backend.tests.test_api',
-        'backend.tests.test_database',
-        'backend.tests.test_file_processing',
-        'backend.tests.test_indexing',
-        'backend.tests.test_incremental_indexing',
-        'backend.tests.test_stream_optimization',
-        'backend.tests.test_search',
-        'backend.tests.test_model_manager',
-        'backend.tests.test_benchmarks',
-        'backend.tests.test_config_and_edge_cases',
-        'backend.tests.test_security',
-        'backend.tests.test_rate_limit',
-        # New coverage additions
-        'backend.tests.test_agent',
-        'backend.tests.test_extraction',
-        'backend.tests.test_rag_pipeline',
-    ]
-    
-    for module in quick_modules:
+
+    for module in modules:
         try:
             suite.addTests(loader.loadTestsFromName(module))
         except Exception as e:
@@ -186,6 +253,82 @@ def run_all_tests():
     suite = loader.discover(tests_dir, pattern='test_*.py', top_level_dir=PROJECT_ROOT)
     return suite
 
+def all_test_modules(pattern='test_*.py'):
+    """
+    Lists every test module in backend/tests matching pattern.
+
+    Returns:
+        list[str]: Dotted module names, sorted.
+    """
+    tests_dir = os.path.join(PROJECT_ROOT, 'backend', 'tests')
+    return sorted(f"backend.tests.{os.path.splitext(name)[0]}"
+                  for name in os.listdir(tests_dir) if fnmatch.fnmatch(name, pattern))
+
+class ParallelResult:
+    """Merged outcome of test modules run in worker processes (mirrors ProgressTestResult)."""
+
+    def __init__(self):
+        self.testsRun = 0
+        self.passed = 0
+        self.failures = []
+        self.errors = []
+        self.skipped = []
+
+    def merge(self, payload):
+        """Adds one worker's RESULT_MARKER payload."""
+        self.testsRun += payload['run']
+        self.passed += payload['passed']
+        self.failures.extend(map(tuple, payload['failures']))
+        self.errors.extend(map(tuple, payload['errors']))
+        self.skipped.extend(map(tuple, payload['skipped']))
+
+def _run_worker(modules):
+    """Runs modules in a fresh run_tests.py process; returns (modules, payload or None, output, seconds)."""
+    cmd = [sys.executable, os.path.abspath(__file__)]
+    for module in modules:
+        cmd += ['--module', module]
+    start = time.monotonic()
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    output = proc.stdout + proc.stderr
+    payload = None
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            payload = json.loads(line[len(RESULT_MARKER):])
+            break
+    return modules, payload, output, time.monotonic() - start
+
+def run_parallel(modules, workers):
+    """
+    Runs test modules in up to `workers` child processes, each with its own
+    temp database, and merges their results.
+
+    Modules in SHARED_CONFIG_MODULES share one worker and run in order.
+
+    Returns:
+        ParallelResult: Combined counts, failures and errors.
+    """
+    lane = [m for m in modules if m in SHARED_CONFIG_MODULES]
+    jobs = ([lane] if lane else []) + [[m] for m in modules if m not in SHARED_CONFIG_MODULES]
+    print(f"{Colors.CYAN}Running {len(modules)} modules in {min(workers, len(jobs))} worker processes...{Colors.ENDC}\n")
+
+    result = ParallelResult()
+    # Threads only wait on child processes, so the GIL is not a factor
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_worker, job) for job in jobs]
+        for future in as_completed(futures):
+            job, payload, output, seconds = future.result()
+            name = ", ".join(m.rsplit('.', 1)[-1] for m in job)
+            if payload is None:
+                # The worker crashed before reporting; surface its output as an error
+                result.errors.append((name, output[-2000:]))
+                print(f"{Colors.RED}E{Colors.ENDC}  {name} (worker crashed) [{seconds:.1f}s]")
+                continue
+            result.merge(payload)
+            ok = not payload['failures'] and not payload['errors']
+            status = f"{Colors.GREEN}OK{Colors.ENDC}" if ok else f"{Colors.RED}FAIL{Colors.ENDC}"
+            print(f"{status} {name} ({payload['run']} tests) [{seconds:.1f}s]")
+    return result
+
 def main():
     """
     Main entry point for the test runner.
@@ -203,6 +346,10 @@ def main():
                        help='Run with coverage (requires pytest-cov)')
     parser.add_argument('--pattern', '-p', type=str, default='test_*.py',
                        help='Test file pattern to match')
+    parser.add_argument('--parallel', '-j', type=int, default=1, metavar='N',
+                       help='Run test modules in N worker processes')
+    # Internal: set by --parallel for each worker process
+    parser.add_argument('--module', action='append', help=argparse.SUPPRESS)
     args = parser.parse_args()
     
     print_header("DOCU AI SEARCH TEST SUITE")
@@ -218,7 +365,8 @@ def main():
     # would otherwise overwrite the developer's real configuration.
     config_path = os.path.join(PROJECT_ROOT, 'config.ini')
     config_backup = None
-    if os.path.exists(config_path):
+    # (--parallel workers leave this to the parent, which outlives them)
+    if os.path.exists(config_path) and not args.module:
         with open(config_path, 'r', encoding='utf-8', newline='') as fh:
             config_backup = fh.read()
 
@@ -229,7 +377,7 @@ def main():
         # Initialize the database schema
         database.init_database()
         
-        start_time = time.time()
+        start_time = time.monotonic()
 
         # Check for pytest with coverage
         if args.coverage:
@@ -249,21 +397,36 @@ def main():
                 print(f"{Colors.YELLOW}pytest-cov not installed. Running with unittest...{Colors.ENDC}")
 
         # Select test suite
-        if args.quick:
-            print(f"{Colors.YELLOW}Running QUICK tests (skipping slow model tests)...{Colors.ENDC}\n")
-            suite = run_quick_tests()
+        if args.module:
+            result = ProgressTestRunner().run(load_modules(args.module))
+            print(RESULT_MARKER + json.dumps({
+                'run': result.testsRun,
+                'passed': result.passed,
+                'failures': [(str(t), tb) for t, tb in result.failures],
+                'errors': [(str(t), tb) for t, tb in result.errors],
+                'skipped': [(str(t), reason) for t, reason in result.skipped],
+            }))
+        elif args.parallel > 1:
+            if args.quick:
+                print(f"{Colors.YELLOW}Running QUICK tests (skipping slow model tests)...{Colors.ENDC}\n")
+            modules = QUICK_MODULES if args.quick else all_test_modules(args.pattern)
+            result = run_parallel(modules, args.parallel)
         else:
-            print(f"Running ALL tests...\n")
-            suite = run_all_tests()
+            if args.quick:
+                print(f"{Colors.YELLOW}Running QUICK tests (skipping slow model tests)...{Colors.ENDC}\n")
+                suite = run_quick_tests()
+            else:
+                print(f"Running ALL tests...\n")
+                suite = run_all_tests()
 
-        # Create test runner with progress bar
-        runner = ProgressTestRunner()
+            # Create test runner with progress bar
+            runner = ProgressTestRunner()
 
-        # Run tests
-        result = runner.run(suite)
+            # Run tests
+            result = runner.run(suite)
 
         # Calculate duration
-        duration = time.time() - start_time
+        duration = time.monotonic() - start_time
 
         # Print summary
         print_header("TEST SUMMARY")
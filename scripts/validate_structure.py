@@ -7,6 +7,7 @@ outside 'data/'), and mandatory directory existence.
 """
 import os
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # Protocol Definitions
 ALLOWED_ROOT_FILES = [
@@ -16,6 +17,11 @@ ALLOWED_ROOT_FILES = [
 ]
 ALLOWED_ROOT_EXTENSIONS = ['.md', '.json', '.ini', '.txt', '.js', '.png', '.PNG'] # limited JS allow for tailwind.config?
 DISALLOWED_ROOT_EXTENSIONS = ['.py']
+# Lookup forms of the lists above: sets for names, tuples for str.endswith
+_ALLOWED_ROOT_FILES = frozenset(ALLOWED_ROOT_FILES)
+_ALLOWED_ROOT_SUFFIXES = tuple(ALLOWED_ROOT_EXTENSIONS)
+_DISALLOWED_ROOT_SUFFIXES = tuple(DISALLOWED_ROOT_EXTENSIONS)
+_SKIP_ROOT_ITEMS = frozenset({'venv', 'node_modules', '__pycache__', 'tmp', 'scratch'})
 
 STRUCTURE_RULES = {
     'backend': {
@@ -33,6 +39,55 @@ STRUCTURE_RULES = {
 }
 
 DATA_EXTENSIONS = ['.db', '.faiss', '.pkl']
+_DATA_SUFFIXES = tuple(DATA_EXTENSIONS)
+
+# Directories never searched for leaked data files. They are pruned before
+# the walk descends, so e.g. node_modules is not stat()ed file by file.
+SKIP_WALK_DIRS = frozenset({'venv', '.venv', 'node_modules', '.git', '__pycache__', 'tests', 'data'})
+
+def _scan_dir(path):
+    """
+    Lists one directory for the data-leak walk.
+
+    Classifies entries the way os.walk does: symlinked directories count as
+    directories but are not descended into.
+
+    Returns:
+        tuple: (data files found here, subdirectories still to scan)
+    """
+    leaks, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    if entry.name not in SKIP_WALK_DIRS and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(_DATA_SUFFIXES):
+                    leaks.append(entry.path)
+    except OSError:
+        pass  # unreadable directory, as os.walk's default onerror
+    return leaks, subdirs
+
+def find_data_leaks(project_root):
+    """
+    Walks the tree breadth-first, scanning directories on a thread pool.
+
+    scandir/stat release the GIL, so on a cold cache several directory
+    reads are in flight at once instead of one at a time.
+
+    Returns:
+        list: Sorted paths of data files outside the skipped directories.
+    """
+    leaks = []
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        pending = {pool.submit(_scan_dir, project_root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                found, subdirs = future.result()
+                leaks.extend(found)
+                pending.update(pool.submit(_scan_dir, d) for d in subdirs)
+    return sorted(leaks)
 
 def validate_structure():
     """
@@ -58,22 +113,21 @@ def validate_structure():
     print(f"Validating specific folder structure in: {project_root}")
 
     # 1. Check Root Directory for Pollution
-    for item in os.listdir(project_root):
-        if item.startswith('.') or item == 'venv' or item == 'node_modules' or item == '__pycache__' or item == 'tmp' or item == 'scratch':
+    # scandir entries answer is_file()/is_dir() from the directory listing on
+    # most platforms, so skipped items cost no path join and no stat()
+    for entry in os.scandir(project_root):
+        item = entry.name
+        if item.startswith('.') or item in _SKIP_ROOT_ITEMS:
             continue
-            
-        full_path = os.path.join(project_root, item)
-        
-        if os.path.isfile(full_path):
-            ext = os.path.splitext(item)[1]
-            
-            if ext in DISALLOWED_ROOT_EXTENSIONS:
+
+        if entry.is_file():
+            if item.endswith(_DISALLOWED_ROOT_SUFFIXES):
                 errors.append(f"ROOT POLLUTION: Found {item} in root. Move to 'backend/' or 'scripts/'.")
             
-            if item not in ALLOWED_ROOT_FILES and ext not in ALLOWED_ROOT_EXTENSIONS:
+            if item not in _ALLOWED_ROOT_FILES and not item.endswith(_ALLOWED_ROOT_SUFFIXES):
                 warnings.append(f"ROOT WARNING: Unexpected file {item} in root.")
 
-        elif os.path.isdir(full_path):
+        elif entry.is_dir():
             if item == 'models':
                 continue # Allowed
             if item not in STRUCTURE_RULES and item not in ['frontend', 'backend', 'scripts', 'data']:
@@ -88,16 +142,9 @@ def validate_structure():
         warnings.append("MISSING DIRECTORY: 'data/' directory should exist for generated files.")
         
     # Check if data files are leaking elsewhere
-    for root, dirs, files in os.walk(project_root):
-        if 'venv' in root or 'node_modules' in root or 'tests' in root or '.git' in root or 'data' in root:
-            continue
-            
-        for file in files:
-            ext = os.path.splitext(file)[1]
-            if ext in DATA_EXTENSIONS:
-                # relative path
-                rel_path = os.path.relpath(os.path.join(root, file), project_root)
-                errors.append(f"DATA LEAK: Found data file '{rel_path}' outside 'data/' directory.")
+    for path in find_data_leaks(project_root):
+        rel_path = os.path.relpath(path, project_root)
+        errors.append(f"DATA LEAK: Found data file '{rel_path}' outside 'data/' directory.")
 
     # Report
     print("\n--- Validation Report ---")
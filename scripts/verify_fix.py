@@ -35,6 +35,9 @@ sys.path.append(PROJECT_ROOT)
 # but we can try to hit the endpoint if the server was running. 
 # Since we are in a script, we will simulate the backend logging setup logic.
 
+# Only the bytes appended from here on can contain the new entry
+log_offset = os.path.getsize(LOG_PATH) if os.path.exists(LOG_PATH) else 0
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - [%(levelname)s] - %(message)s',
@@ -48,12 +51,15 @@ logger.info("TEST LOG ENTRY - If you see this in app.log, logging is working.")
 
 if os.path.exists(LOG_PATH):
     print(f"SUCCESS: Log file found at {LOG_PATH}")
-    with open(LOG_PATH, 'r') as f:
-        content = f.read()
-        if "TEST LOG ENTRY" in content:
-            print("SUCCESS: Test log entry found in file.")
-        else:
-            print("FAILURE: Test log entry NOT found in file.")
+    # Stream just the tail written above, line by line, rather than reading
+    # what may be a very large log into memory
+    with open(LOG_PATH, 'rb', buffering=1 << 20) as f:
+        f.seek(log_offset)
+        found = any(b"TEST LOG ENTRY" in line for line in f)
+    if found:
+        print("SUCCESS: Test log entry found in file.")
+    else:
+        print("FAILURE: Test log entry NOT found in file.")
 else:
     print(f"FAILURE: Log file not found at {LOG_PATH}")
 
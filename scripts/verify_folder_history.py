@@ -1,10 +1,28 @@
 
+import functools
 import requests
 import json
 import os
 
 API_URL = "http://localhost:8000/api"
 
+# One keep-alive connection for every call instead of a new socket per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+
+@functools.lru_cache(maxsize=1)
+def get_config():
+    """
+    Fetches /api/config once; later calls reuse the parsed dict until
+    get_config.cache_clear() is called after a POST that changes it.
+
+    Raises:
+        requests.HTTPError: If the server does not answer 200 (not cached).
+    """
+    resp = SESSION.get(f"{API_URL}/config")
+    resp.raise_for_status()
+    return resp.json()
+
 def test_folder_history():
     """
     Verifies that folders added to the configuration are correctly persisted in 
@@ -18,19 +36,17 @@ def test_folder_history():
     """
     print("0. Checking API health...")
     try:
-        resp = requests.get(f"{API_URL}/config")
-        print(f"Health Check: {resp.status_code}")
-        if resp.status_code != 200:
-            print(f"Server is running but returned {resp.status_code}")
-        else:
-            print("Server is UP and responding to /api/config")
+        get_config()
+        print("Server is UP and responding to /api/config")
+    except requests.HTTPError as e:
+        print(f"Server is running but returned {e.response.status_code}")
     except Exception as e:
         print(f"Server is DOWN or unreachable: {e}")
         return
 
     print("1. Checking initial history...")
     try:
-        resp = requests.get(f"{API_URL}/folders/history")
+        resp = SESSION.get(f"{API_URL}/folders/history")
         if resp.status_code != 200:
             print(f"FAILED: /folders/history returned {resp.status_code}")
             return
@@ -42,20 +58,19 @@ def test_folder_history():
 
     print("\n2. Updating config with new folder...")
     test_folders = ["C:/Users/siddh/Documents/TestFolder1"]
-    current_config_resp = requests.get(f"{API_URL}/config")
-    config = current_config_resp.json()
-    
-    config['folders'] = test_folders
-    
-    resp = requests.post(f"{API_URL}/config", json=config)
+    # Reuses the health-check response; copy so the cached dict stays intact
+    config = {**get_config(), 'folders': test_folders}
+
+    resp = SESSION.post(f"{API_URL}/config", json=config)
     if resp.status_code == 200:
+        get_config.cache_clear()
         print("Config updated successfully")
     else:
         print(f"FAILED to update config: {resp.text}")
         return
 
     print("\n3. Checking history after update...")
-    resp = requests.get(f"{API_URL}/folders/history")
+    resp = SESSION.get(f"{API_URL}/folders/history")
     history = resp.json()
     print(f"History: {history}")
     
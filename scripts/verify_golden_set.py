@@ -1,13 +1,21 @@
 
+import functools
 import os
 import requests
 import time
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
 
 # Backend URL
 API_URL = "http://localhost:8000/api"
+# Push channel the backend broadcasts indexing progress/completion on
+WS_URL = "ws://localhost:8000/ws/progress"
+
+# One keep-alive connection for every call instead of a new socket per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
 GOLDEN_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "golden_dataset")
 
 def wait_for_backend():
@@ -18,6 +26,26 @@ def wait_for_backend():
     Returns:
         bool: True if the backend responds successfully, False otherwise.
     """
+    for _ in range(10):
+        try:
+            get_config()
+            return True
+        except requests.RequestException:
+            time.sleep(1)
+    return False
+
+@functools.lru_cache(maxsize=1)
+def get_config():
+    """
+    Fetches /api/config once; wait_for_backend() and configure_folder() then
+    share the parsed dict. Call get_config.cache_clear() after changing it.
+
+    Raises:
+        requests.HTTPError: If the server does not answer 200 (not cached).
+    """
+    r = SESSION.get(f"{API_URL}/config")
+    r.raise_for_status()
+    return r.json()
 
 def configure_folder():
     """
@@ -26,37 +54,126 @@ def configure_folder():
     monitored folder list.
     """
     print(f"Adding {GOLDEN_DIR} to config...")
-    # Get current config
-    r = requests.get(f"{API_URL}/config")
-    current_config = r.json()
+    # Get current config (already fetched by wait_for_backend)
+    current_config = get_config()
     folders = current_config.get('folders', [])
-    
+
     if GOLDEN_DIR not in folders:
-        folders.append(GOLDEN_DIR)
-        requests.post(f"{API_URL}/config", json={**current_config, "folders": folders})
+        SESSION.post(f"{API_URL}/config", json={**current_config, "folders": folders + [GOLDEN_DIR]})
+        get_config.cache_clear()
         print("Folder added.")
     else:
         print("Folder already configured.")
 
-def trigger_indexing():
+def _open_progress_socket():
     """
-    Initiates a background indexing process and monitors its progress.
-    Blocks execution until the indexing status reports that it is no longer running.
+    Subscribes to the backend's progress WebSocket.
+
+    Returns:
+        The open connection, or None if the `websockets` client is not
+        installed or the server does not accept the upgrade.
     """
-    print("Triggering index...")
-    requests.post(f"{API_URL}/index")
-    
-    # Poll status
+    try:
+        from websockets.sync.client import connect
+    except ImportError:
+        return None
+    try:
+        return connect(WS_URL, open_timeout=5)
+    except Exception as e:
+        print(f"Progress socket unavailable ({e}); polling instead.")
+        return None
+
+def _wait_on_socket(ws):
+    """
+    Blocks on the progress stream until an indexing_complete or error event.
+    Re-checks /index/status whenever the stream is quiet for 30 s, in case
+    the terminal event was missed.
+    """
+    from websockets.exceptions import ConnectionClosed
+    with ws:
+        while True:
+            try:
+                event = json.loads(ws.recv(timeout=30))
+            except TimeoutError:
+                if not SESSION.get(f"{API_URL}/index/status").json()['running']:
+                    return
+                continue
+            except ConnectionClosed:
+                break
+            if event.get('type') == 'indexing_progress':
+                print(f"Indexing: {event['percent']}%...")
+            elif event.get('type') == 'indexing_complete':
+                return
+            elif event.get('type') == 'error':
+                print(f"Indexing error: {event.get('message')}")
+                return
+    # Server closed the socket before the job finished; finish by polling
+    _poll_until_idle()
+
+def _poll_until_idle():
+    """Poll status: quickly at first so short jobs return fast, backing off
+    to the old 2 s interval for long ones."""
+    delay = 0.25
     while True:
-        r = requests.get(f"{API_URL}/index/status")
+        r = SESSION.get(f"{API_URL}/index/status")
         status = r.json()
         if not status['running']:
-            print("Indexing complete.")
-            break
+            return
         print(f"Indexing: {status['progress']}%...")
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+
+def trigger_indexing():
+    """
+    Initiates a background indexing process and monitors its progress.
+    Blocks execution until the indexing status reports that it is no longer running.
 
-def verify_query(query: str, expected_text: str, filename: str) -> bool:
+    Waits on the /ws/progress push stream when available, so it wakes on
+    the completion event instead of up to one poll interval later; falls
+    back to polling /index/status otherwise.
+    """
+    # Subscribe before starting the job so the completion event can't be missed
+    ws = _open_progress_socket()
+    print("Triggering index...")
+    SESSION.post(f"{API_URL}/index")
+
+    if ws is not None:
+        _wait_on_socket(ws)
+    else:
+        _poll_until_idle()
+    print("Indexing complete.")
+
+def search_one(query):
+    """
+    Sends a single query to /search.
+
+    Returns:
+        dict: The search response, or {"error": status_code} on failure.
+    """
+    r = SESSION.post(f"{API_URL}/search", json={"query": query})
+    if r.status_code != 200:
+        return {"error": r.status_code}
+    return r.json()
+
+def search_all(queries):
+    """
+    Runs every query through one /search/batch call, so the backend looks
+    them up with a single batched FAISS query. Backends without the batch endpoint get
+    the queries as concurrent /search calls instead; the work is just HTTP
+    round trips, so a few threads over the pooled session suffice.
+
+    Returns:
+        list: One search response per query, in input order.
+    """
+    queries = list(queries)
+    r = SESSION.post(f"{API_URL}/search/batch", json={"queries": queries})
+    if r.status_code == 200:
+        return r.json()
+    print(f"Batch search unavailable ({r.status_code}); searching queries concurrently.")
+    with ThreadPoolExecutor(max_workers=min(4, len(queries))) as pool:
+        return list(pool.map(search_one, queries))
+
+def verify_query(query: str, expected_text: str, filename: str, data: dict = None) -> bool:
     """
     Performs a search query and validates that the expected answer is retrieved.
 
@@ -67,28 +184,32 @@ def verify_query(query: str, expected_text: str, filename: str) -> bool:
         query (str): The search question to ask.
         expected_text (str): The specific text/fact expected in the results.
         filename (str): The name of the file that should contain the information.
+        data (dict, optional): This query's response from search_all(); if
+            omitted, the query is sent to /search on its own.
 
     Returns:
         bool: True if the expected text is found in either results or AI answer.
     """
     print(f"\nQuerying: '{query}'...")
-    r = requests.post(f"{API_URL}/search", json={"query": query})
-    if r.status_code != 200:
-        print(f"Search failed: {r.status_code}")
+    if data is None:
+        data = search_one(query)
+    if 'error' in data:
+        print(f"Search failed: {data['error']}")
         return False
-        
-    data = r.json()
+
     results = data.get('results', [])
-    ai_answer = data.get('ai_answer', '')
-    
-    found_in_results = False
-    for res in results:
-        if filename in str(res.get('file_name', '')) or filename in str(res.get('file_path', '')):
-            if expected_text.lower() in res.get('summary', '').lower() or expected_text.lower() in res.get('document', '').lower():
-                found_in_results = True
-                break
-                
-    found_in_answer = expected_text.lower() in ai_answer.lower()
+    ai_answer = data.get('ai_answer') or ''
+    needle = expected_text.lower()
+
+    # Only results from the expected file are lowercased and searched, and
+    # the scan stops at the first hit. summary may be null in the response.
+    found_in_results = any(
+        needle in (res.get('summary') or '').lower() or needle in (res.get('document') or '').lower()
+        for res in results
+        if filename in (res.get('file_name') or '') or filename in (res.get('file_path') or '')
+    )
+
+    found_in_answer = needle in ai_answer.lower()
     
     print(f"  > Found in Results: {found_in_results}")
     print(f"  > Found in AI Answer: {found_in_answer}")
@@ -116,9 +237,12 @@ def main():
         ("What percent of enterprises plan to adopt AI agents?", "85%", "synthetic_report.docx")
     ]
     
+    # Fetch every answer up front (one batch call, or concurrent requests),
+    # then check them in order so the report isn't interleaved
+    responses = search_all(q for q, _, _ in tests)
     passed = 0
-    for q, expected, fname in tests:
-        if verify_query(q, expected, fname):
+    for (q, expected, fname), data in zip(tests, responses):
+        if verify_query(q, expected, fname, data):
             passed += 1
             
     print(f"\nTotal Result: {passed}/{len(tests)} tests passed.")
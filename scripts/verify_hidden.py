@@ -3,6 +3,23 @@ import os
 
 API_URL = "http://localhost:8000/api"
 
+# One keep-alive connection for every call instead of a new socket per request
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+
+HIDDEN_MARKER = "golden_dataset"
+
+def _leaked(values):
+    """
+    Returns the entries of `values` containing HIDDEN_MARKER.
+
+    The common (passing) case is one C-level substring scan over the joined
+    list; entries are only inspected one by one to name offenders.
+    """
+    if HIDDEN_MARKER not in "\n".join(values):
+        return []
+    return [v for v in values if HIDDEN_MARKER in v]
+
 def test_hidden_paths():
     """
     Verifies that internal test datasets (like 'golden_dataset') are hidden 
@@ -17,31 +34,39 @@ def test_hidden_paths():
     
     # Check /api/config
     try:
-        r = requests.get(f"{API_URL}/config")
+        r = SESSION.get(f"{API_URL}/config")
         config = r.json()
         folders = config.get('folders', [])
-        assert all("golden_dataset" not in f for f in folders), f"Found golden_dataset in folders: {folders}"
+        leaked = _leaked(folders)
+        assert not leaked, f"Found golden_dataset in folders: {leaked}"
         print("[PASS] /api/config filters golden_dataset")
     except Exception as e:
         print(f"[FAIL] /api/config check: {e}")
 
     # Check /api/files
     try:
-        r = requests.get(f"{API_URL}/api/files")
-        if r.status_code == 404: # Might be /api/files or /files depending on routing
-            r = requests.get(f"{API_URL}/files")
-        
-        files = r.json()
-        assert all("golden_dataset" not in (f.get('path', '') or '') for f in files), "Found golden_dataset in files"
+        # API_URL already ends in /api, so the route is {API_URL}/files; page
+        # at the endpoint's 500-row maximum so most indexes need one request
+        files, offset, total = [], 0, None
+        while total is None or offset < total:
+            r = SESSION.get(f"{API_URL}/files", params={"limit": 500, "offset": offset})
+            r.raise_for_status()
+            page = r.json()
+            files.extend(page['files'])
+            total = page['total']
+            offset += 500
+        leaked = _leaked([f.get('path') or '' for f in files])
+        assert not leaked, f"Found golden_dataset in files: {leaked}"
         print("[PASS] /api/files filters golden_dataset")
     except Exception as e:
         print(f"[ERROR] /api/files check (check if server is running): {e}")
 
     # Check /api/folders/history
     try:
-        r = requests.get(f"{API_URL}/folders/history")
+        r = SESSION.get(f"{API_URL}/folders/history")
         history = r.json()
-        assert all("golden_dataset" not in h for h in history), f"Found golden_dataset in history: {history}"
+        leaked = _leaked(history)
+        assert not leaked, f"Found golden_dataset in history: {leaked}"
         print("[PASS] /api/folders/history filters golden_dataset")
     except Exception as e:
         print(f"[FAIL] /api/folders/history check: {e}")
@@ -1,22 +1,76 @@
 import sys
 import os
+import platform
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+# Exported/quantized ONNX copies live next to the GGUF models so later runs
+# skip the export entirely.
+ONNX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'onnx')
+
+
+def load_int8_onnx_model():
+    """
+    Loads all-MiniLM-L6-v2 as a dynamically int8-quantized ONNX model.
+
+    Exports and quantizes once into models/onnx/; afterwards the cached
+    model_quantized.onnx is loaded directly. Roughly a quarter of the FP32
+    model's memory and warmup, which is all a smoke test needs.
+
+    Returns:
+        The ORTModelForFeatureExtraction, or None if optimum[onnxruntime]
+        is not installed.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError:
+        return None
+
+    fp32_dir = os.path.join(ONNX_DIR, "all-MiniLM-L6-v2")
+    int8_dir = fp32_dir + "-int8"
+    if not os.path.exists(os.path.join(int8_dir, "model_quantized.onnx")):
+        print("Exporting to ONNX and quantizing to int8 (first run only)...")
+        model = ORTModelForFeatureExtraction.from_pretrained(MODEL_ID, export=True, provider="CPUExecutionProvider")
+        model.save_pretrained(fp32_dir)
+        # VNNI int8 dot products on x86, the NEON path on ARM
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(fp32_dir).quantize(save_dir=int8_dir, quantization_config=qconfig)
+    return ORTModelForFeatureExtraction.from_pretrained(
+        int8_dir, file_name="model_quantized.onnx", provider="CPUExecutionProvider")
+
+
 try:
     print("Attempting to import sentence_transformers...")
     import sentence_transformers
     print(f"Success! Version: {sentence_transformers.__version__}")
-    
+
     print("Attempting to import langchain_huggingface...")
     from langchain_huggingface import HuggingFaceEmbeddings
     print("Success! HuggingFaceEmbeddings imported.")
-    
-    print("Attempting to load embeddings model (this might be slow)...")
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    print("Success! Model loaded.")
-    
+
+    if os.environ.get('FULL_SMOKE'):
+        print("Attempting to load embeddings model (this might be slow)...")
+        if load_int8_onnx_model() is not None:
+            print("Success! Model loaded (ONNX int8).")
+        else:
+            # optimum not installed: fall back to the FP32 model the app uses
+            embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+            print("Success! Model loaded.")
+    else:
+        # The config alone proves the transformers import chain and hub
+        # reachability without downloading or initialising any weights.
+        # Set FULL_SMOKE=1 to load the model itself.
+        print("Attempting to fetch embeddings model config...")
+        from transformers import AutoConfig
+        config = AutoConfig.from_pretrained(MODEL_ID)
+        print(f"Success! Config loaded ({config.model_type}, {config.hidden_size}-dim).")
+
 except ImportError as e:
     print(f"IMPORT ERROR: {e}")
     sys.exit(1)